@@ -0,0 +1,187 @@
+import numpy as np
+
+from algorithms.residual_graph import ResidualGraph
+
+def edge_values(values):
+    """
+    Capacities / costs as an array: int64 when every value is integral, float64
+    otherwise (fractional values must not be truncated)
+    """
+    a = np.asarray(values)
+    if a.dtype.kind in "biu":
+        return a.astype(np.int64, copy=False)
+    a = a.astype(np.float64, copy=False)
+    if np.isfinite(a).all() and (a == np.floor(a)).all():
+        return a.astype(np.int64)
+    return a
+
+class CompiledGraph:
+    """
+    Directed graph interned to dense integer ids, shared by all engines
+
+    - node ids 0..n-1, self.nodes[i] is the label of node i (None: labels are the ids)
+    - edge ids 0..m-1, rows of the int64 arrays tail, head and of cap, cost
+      (int64, or float64 when some value is fractional, see edge_values)
+    - adjacency (built by compile_graph, otherwise on first use; plain lists for
+      the engines' inner loops):
+      out_edges[u] / in_edges[v] -> edge ids, tails / heads -> tail / head per edge id
+
+    Engines compile their input once (compile_graph) and only translate back to
+    labels at the API boundary (node_label, edge_label, node_id, edge_id). Pass the
+    same CompiledGraph to several engines / trials to compile only once.
+    """
+    def __init__(self, n, tail, head, cap, cost=None, nodes=None):
+        self.n = n
+        self.m = len(tail)
+        self.tail = np.asarray(tail, dtype=np.int64)
+        self.head = np.asarray(head, dtype=np.int64)
+        self.cap = edge_values(cap)
+        self.cost = np.zeros(self.m, dtype=np.int64) if cost is None else edge_values(cost)
+        self.nodes = nodes
+
+        self._adjacency = None
+        self._node_id = None
+        self._edge_id = None
+
+    @classmethod
+    def from_networkx(cls, G, capacity="capacity", weight="weight"):
+        nodes = list(G.nodes())
+        index = {v: i for i, v in enumerate(nodes)}
+        m = G.number_of_edges()
+
+        edges = G.edges(data=True)
+        tail = np.fromiter((index[u] for u, _, _ in edges), dtype=np.int64, count=m)
+        head = np.fromiter((index[v] for _, v, _ in edges), dtype=np.int64, count=m)
+        cap = edge_values([d[capacity] for _, _, d in edges])
+        cost = edge_values([d.get(weight, 0) for _, _, d in edges])
+
+        C = cls(len(nodes), tail, head, cap, cost, nodes)
+        C._node_id = index
+        return C
+
+    @classmethod
+    def from_arrays(cls, n, tail, head, cap, cost=None, nodes=None):
+        # arrays are used as given (no copy when already int64, or float64 with
+        # fractional values)
+        return cls(n, tail, head, cap, cost, nodes)
+
+    def _build_adjacency(self):
+        tails = self.tail.tolist()
+        heads = self.head.tolist()
+        out_edges = [[] for _ in range(self.n)]
+        in_edges = [[] for _ in range(self.n)]
+        for e in range(self.m):
+            out_edges[tails[e]].append(e)
+            in_edges[heads[e]].append(e)
+        self._adjacency = (out_edges, in_edges, tails, heads)
+
+    @property
+    def out_edges(self):
+        if self._adjacency is None:
+            self._build_adjacency()
+        return self._adjacency[0]
+
+    @property
+    def in_edges(self):
+        if self._adjacency is None:
+            self._build_adjacency()
+        return self._adjacency[1]
+
+    @property
+    def tails(self):
+        if self._adjacency is None:
+            self._build_adjacency()
+        return self._adjacency[2]
+
+    @property
+    def heads(self):
+        if self._adjacency is None:
+            self._build_adjacency()
+        return self._adjacency[3]
+
+    def __getstate__(self):
+        # adjacency lists are cheap to rebuild and large to pickle
+        state = self.__dict__.copy()
+        state["_adjacency"] = None
+        state["_edge_id"] = None
+        return state
+
+    # --- label translation (API boundary) ---
+
+    def node_label(self, i):
+        return i if self.nodes is None else self.nodes[i]
+
+    def node_id(self, label):
+        if self.nodes is None:
+            return label
+        if self._node_id is None:
+            self._node_id = {v: i for i, v in enumerate(self.nodes)}
+        return self._node_id[label]
+
+    def edge_label(self, e):
+        return (self.node_label(self.tails[e]), self.node_label(self.heads[e]))
+
+    def edge_labels(self):
+        return [self.edge_label(e) for e in range(self.m)]
+
+    def edge_id(self, u, v):
+        # first edge u -> v (labels); KeyError if there is none
+        if self._edge_id is None:
+            self._edge_id = {}
+            for e in range(self.m - 1, -1, -1):
+                self._edge_id[self.edge_label(e)] = e
+        return self._edge_id[(u, v)]
+
+    def label_path(self, path):
+        # [(edge id, forward)] arcs from the engines -> node label path
+        if not path:
+            return []
+        e, forward = path[0]
+        nodes = [self.tails[e] if forward else self.heads[e]]
+        for e, forward in path:
+            nodes.append(self.heads[e] if forward else self.tails[e])
+        return [self.node_label(v) for v in nodes]
+
+    def edge_dict(self, values):
+        # per-edge-id values -> Dict[(u, v), value] (parallel edges are summed)
+        result = {}
+        for e, x in enumerate(values):
+            key = self.edge_label(e)
+            result[key] = result.get(key, 0) + x
+        return result
+
+    # --- conversions ---
+
+    def residual_graph(self, flow=None):
+        """
+        input for ssp / cycle_canceling; node i of the ResidualGraph is node id i
+        flow: optional per-edge-id flow to start from (e.g. an engine's f), held
+        as the reverse edges' capacities
+        """
+        g = ResidualGraph(self.n)
+        for u, v, c, w in zip(self.tails, self.heads, self.cap.tolist(), self.cost.tolist()):
+            g.add_edge(u, v, c, w)
+        if flow is not None:
+            for (u, i), x in zip(g.edges, flow):
+                g.push(u, i, x)
+        return g
+
+    def to_digraph(self):
+        import networkx as nx
+
+        G = nx.DiGraph()
+        G.add_nodes_from(self.node_label(i) for i in range(self.n))
+        for e, (c, w) in enumerate(zip(self.cap.tolist(), self.cost.tolist())):
+            u, v = self.edge_label(e)
+            G.add_edge(u, v, capacity=c, weight=w)
+        return G
+
+
+def compile_graph(G):
+    # nx.DiGraph -> CompiledGraph; a CompiledGraph is passed through unchanged.
+    # The adjacency is built here, so engines sharing a graph (and their timed
+    # runs) all start from the same state, whichever runs first
+    C = G if isinstance(G, CompiledGraph) else CompiledGraph.from_networkx(G)
+    if C._adjacency is None:
+        C._build_adjacency()
+    return C
@@ -0,0 +1,99 @@
+import math
+import numpy as np
+from algorithms.bellman_ford_np import arc_arrays, has_negative_cycle
+
+def min_mean_cycle(graph):
+    """
+    Karp's minimum mean cycle over the residual arcs (cap > 0), vectorized per level
+
+    D[k][v] is the min cost of a walk of exactly k arcs ending at v (walks may start
+    anywhere); the min cycle mean is min_v max_k (D[n][v] - D[k][v]) / (n - k), and
+    the walk of n arcs to the minimizing v contains a cycle of that mean.
+    Only the D rows are stored: the walk is rebuilt from them (the arc into v at
+    level k is one with D[k-1][tail] + cost == D[k][v]). O(n * m) time, O(n^2) memory.
+
+    Output:
+    - (mean, cycle) with cycle = List[(u, index in g[u])] in walk order; or None
+      if the residual graph has no cycle
+    """
+    n = graph.n
+    tail, head, cost, local, _, cap, _ = arc_arrays(graph)
+
+    idx = np.flatnonzero(cap > 0)
+    if idx.size == 0:
+        return None
+    tails, heads, costs = tail[idx], head[idx], cost[idx]
+
+    D = np.full((n + 1, n), np.inf)
+    D[0] = 0
+
+    for k in range(1, n + 1):
+        np.minimum.at(D[k], heads, D[k - 1][tails] + costs)
+
+    finite = D[n] < np.inf
+    if not finite.any():
+        return None
+
+    with np.errstate(invalid="ignore"):
+        ratios = (D[n][None, :] - D[:n]) / (n - np.arange(n))[:, None]
+    ratios[np.isnan(ratios)] = -np.inf
+    worst = ratios.max(axis=0)
+    worst[~finite] = np.inf
+    v = int(worst.argmin())
+
+    # walk back n arcs from v; the first repeated node closes the cycle
+    seen = {}
+    walk = []
+    for k in range(n, 0, -1):
+        if v in seen:
+            break
+        seen[v] = len(walk)
+        into = np.flatnonzero((heads == v) & (D[k - 1][tails] + costs == D[k][v]))
+        a = int(idx[into[0]])
+        walk.append(a)
+        v = int(tail[a])
+
+    cycle = walk[seen[v]:][::-1]
+    mean = float(cost[cycle].sum()) / len(cycle)
+    return mean, [(int(tail[a]), int(local[a])) for a in cycle]
+
+def flow_cost(graph):
+    # cost of the flow held in graph (reverse capacities of the forward edges)
+    total = 0
+    for u, i in graph.edges:
+        e = graph.g[u][i]
+        total += e.cost * graph.g[e.to][e.rev].cap
+    return total
+
+def cycle_canceling(graph, max_cancels=math.inf, eps=1e-9):
+    """
+    Min-cost flow by canceling negative residual cycles, picking a minimum mean
+    cycle each time (polynomially many cancellations)
+
+    Starts from whatever flow graph already holds (see CompiledGraph.residual_graph's
+    flow, or a graph left by ssp), so re-optimizing after a small cost change only
+    cancels the few cycles the change made negative. The flow value never changes:
+    a feasible max flow becomes a min-cost max flow.
+
+    Output:
+    - total_cost: cost of the resulting flow
+    - cancels: number of cycles canceled
+    """
+    cancels = 0
+    while cancels < max_cancels:
+        # cheap check first: Karp is O(n * m) even when the flow is already optimal
+        if not has_negative_cycle(graph):
+            break
+        found = min_mean_cycle(graph)
+        if found is None or found[0] >= -eps:
+            break
+        _, cycle = found
+
+        # push the bottleneck around the cycle
+        delta = min(graph.g[u][i].cap for u, i in cycle)
+        for u, i in cycle:
+            graph.push(u, i, delta)
+
+        cancels += 1
+
+    return flow_cost(graph), cancels
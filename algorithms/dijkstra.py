@@ -0,0 +1,60 @@
+import heapq
+import math
+
+def dijkstra(graph, s, t):
+    """
+    Shortest path on reduced costs cost(u, v) + pot[u] - pot[v], for use as ssp's sp
+
+    The potentials live on the graph (graph.potential) between calls and are
+    updated with the distances of every search, which keeps all residual reduced
+    costs non-negative after each augmentation. Edge costs must be non-negative
+    on the first call (potentials start at 0).
+
+    Output (same as bellman_ford):
+    - dist: true (not reduced) distances from s, prev_node, prev_edge; or None
+    """
+    n = graph.n
+    INF = math.inf
+
+    if graph.potential is None:
+        graph.potential = [0] * n
+    pot = graph.potential
+
+    dist = [INF] * n
+    dist[s] = 0
+
+    prev_node = [-1] * n
+    prev_edge = [-1] * n
+
+    # settled nodes are final: with float costs a rounding-negative reduced cost
+    # must not reopen them (it could close a cycle in prev_node)
+    done = [False] * n
+
+    heap = [(0, s)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = True
+        pu = pot[u]
+        for idx, e in enumerate(graph.g[u]):
+            if e.cap <= 0 or done[e.to]:
+                continue
+            nd = d + e.cost + pu - pot[e.to]
+            if nd < dist[e.to]:
+                dist[e.to] = nd
+                prev_node[e.to] = u
+                prev_edge[e.to] = idx
+                heapq.heappush(heap, (nd, e.to))
+
+    if dist[t] == INF:
+        return None
+
+    # reduced -> true distances, then move the potentials
+    true_dist = [INF] * n
+    for v in range(n):
+        if dist[v] < INF:
+            true_dist[v] = dist[v] - pot[s] + pot[v]
+            pot[v] += dist[v]
+
+    return true_dist, prev_node, prev_edge
@@ -1,74 +1,87 @@
-import networkx as nx
+from algorithms.compiled_graph import compile_graph
+from algorithms.path_search import BidirectionalSearch, reachable
 
 class FordFulkerson:
-    def __init__(self, G, source, sink):
+    def __init__(self, G, source, sink, record_paths=False):
         """
+        G: nx.DiGraph or CompiledGraph (compiled once, shareable between engines)
+        record_paths: keep every augmenting path as (path, amount) in self.paths;
+        reset to None once an augmentation uses a backward edge (the paths no
+        longer decompose the flow, see flow_decomposition.engine_paths)
         """
-        self.G = G.copy()
+        self.C = compile_graph(G)
         self.s = source
         self.t = sink
+        self.si = self.C.node_id(source)
+        self.ti = self.C.node_id(sink)
 
-        self.flow = {(u, v): 0 for (u, v) in self.G.edges()}
+        # per edge id: f = flow (reverse residual), res = capacity - flow (forward residual)
+        self.f = [0] * self.C.m
+        self.res = self.C.cap.tolist()
         self.augment_count = 0
-
-    def build_residual_graph(self):
-        R = nx.DiGraph()
-
-        # forward edges
-        for (u, v) in self.G.edges():
-            rc = self.G[u][v]["capacity"] - self.flow[(u, v)]
-            if rc > 0:
-                R.add_edge(u, v, capacity=rc)
-
-        # reverse edges 
-        for (u, v) in self.G.edges():
-            f = self.flow[(u, v)]
-            if f > 0:
-                R.add_edge(v, u, capacity=f)
-
-        return R
+        self.paths = [] if record_paths else None
+        # flow dict built on first access, dropped by augment()
+        self._flow = None
+        self.search = BidirectionalSearch(self.C)
+
+    @property
+    def flow(self):
+        # Dict[(u, v), flow] with node labels
+        if self._flow is None:
+            self._flow = self.C.edge_dict(self.f)
+        return self._flow
 
     def find_path(self):
-        R = self.build_residual_graph()
-
-        if self.s not in R.nodes or self.t not in R.nodes:
-            return None
-
-        try:
-            path = nx.shortest_path(R, self.s, self.t)
-            return path
-        except nx.NetworkXNoPath:
-            return None
+        # List[(edge id, forward)] from s to t, or None
+        return self.search.path(self.si, self.ti, self.res, self.f)
 
     def augment(self, path):
         # find bottleneck
-        capacities = []
-        for i in range(len(path) - 1):
-            u, v = path[i], path[i+1]
-
-            if (u, v) in self.G.edges():
-                # forward edge
-                capacities.append(self.G[u][v]["capacity"] - self.flow[(u, v)])
-            else:
-                # reverse edge
-                capacities.append(self.flow[(v, u)])
-
-        bottleneck = min(capacities)
+        bottleneck = min(self.res[e] if forward else self.f[e] for e, forward in path)
 
         # apply augmentation
-        for i in range(len(path) - 1):
-            u, v = path[i], path[i+1]
-
-            if (u, v) in self.G.edges(): 
-                # forward
-                self.flow[(u, v)] += bottleneck
-            else:  
+        forward_only = True
+        for e, forward in path:
+            if forward:
+                self.f[e] += bottleneck
+                self.res[e] -= bottleneck
+            else:
                 # reverse
-                self.flow[(v, u)] -= bottleneck
+                self.f[e] -= bottleneck
+                self.res[e] += bottleneck
+                forward_only = False
+
+        if self.paths is not None:
+            if forward_only:
+                self.paths.append((self.C.label_path(path), bottleneck))
+            else:
+                self.paths = None
 
+        self._flow = None
         self.augment_count += 1
         return bottleneck
 
+    def min_cut(self):
+        """
+        Minimum s-t cut from the final residual state (call after run()),
+        one BFS over residual edges: O(E)
+
+        Output:
+        - source_side: Set[node] -> nodes reachable from s in the residual graph
+        - cut_edges: List[(u, v)] -> saturated edges leaving source_side
+        """
+        C = self.C
+        side = reachable(C, self.si, self.res, self.f)
+
+        source_side = {C.node_label(u) for u in side}
+        cut_edges = [
+            C.edge_label(e)
+            for u in side
+            for e in C.out_edges[u]
+            if C.heads[e] not in side
+        ]
+        return source_side, cut_edges
+
     def run(self):
         while True:
             path = self.find_path()
@@ -80,10 +93,6 @@ class FordFulkerson:
                 break
 
         # add up flow of each outflow edge from source
-        total_flow = sum(
-            self.flow[(self.s, v)]
-            for (u, v) in self.flow
-            if u == self.s
-        )
+        total_flow = sum(self.f[e] for e in self.C.out_edges[self.si])
 
         return self.flow, total_flow, self.augment_count
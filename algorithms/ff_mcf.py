@@ -1,115 +1,423 @@
-import networkx as nx
+import heapq
+import itertools
+import os
+import time
+import numpy as np
+from algorithms.compiled_graph import compile_graph
+from algorithms.flow_result import FlowResult
+from algorithms.mcf_bounds import throughput_upper_bound
+from algorithms.path_search import EPS, BidirectionalSearch, bfs_tree, tree_path, reachable
+from algorithms.shared_graph import SharedArray, SharedGraph
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# per process-pool worker, set once by _init_worker: the attached graph and its path
+# search, the attached round state (row 0: shared residual, row 1 + k: flow of
+# commodity k) and the residual list of the round last read
+_worker_graph = None
+_worker_search = None
+_worker_state = None
+_worker_res = (None, None)
+
+def _init_worker(graph_handle, state_handle):
+    global _worker_graph, _worker_search, _worker_state
+    _worker_graph = SharedGraph.attach(graph_handle)
+    _worker_search = BidirectionalSearch(_worker_graph.compiled())
+    _worker_state = SharedArray.attach(state_handle)
+
+def _worker_find_path(args):
+    global _worker_res
+    rnd, k, s, t = args
+    state = _worker_state.array
+    if _worker_res[0] != rnd:
+        # the round's residual snapshot, converted once per worker
+        _worker_res = (rnd, state[0].tolist())
+    return _worker_search.path(s, t, _worker_res[1], state[1 + k].tolist())
+
+# scheduling policies of the sequential run(): key(ff, p), smallest key served
+# first, commodities with equal keys in FIFO order
+POLICIES = {
+    # round-robin: one augmentation each, in commodity order
+    "fifo": lambda ff, p: 0,
+    # largest remaining demand first
+    "remaining": lambda ff, p: ff.throughput[p] - ff.ends[p][2],
+}
 
 class MultiCommodityFlowFF:
     """
     Input:
-    - graph: NetworkX.DiGraph() -> networkx directed graph
+    - graph: NetworkX.DiGraph() or CompiledGraph -> directed graph
     - commodities: Dict[str, (src, dst, demand)] -> commodity p to (source, sink, and demand)
 
     Output:
-    - flow: Dict[str, Dict[(str, str), float]] -> used capacity on each edge for each commodity
+    - flow: FlowResult -> used capacity on each edge for each commodity
+      (K x E array, indexable like Dict[str, Dict[(str, str), float]])
     - throughput: Dict[str, float] -> sent/satisfied demand for each commodity
+
+    Internally everything runs on the compiled graph's integer node / edge ids;
+    paths are List[(edge id, forward)].
     """
-    def __init__(self, G, commodities):
-        self.G = G.copy()
+    def __init__(self, G, commodities, record_paths=False):
+        """
+        record_paths: keep each commodity's augmenting paths as (path, amount) in
+        self.paths[p]; a commodity's list is reset to None once it augments along
+        a backward edge (see flow_decomposition.engine_paths)
+        """
+        self.C = compile_graph(G)
         self.commodities = commodities
 
-        # flow[p][(u,v)]: amount of flow of commodity p on edge (u, v), same as reverse capacity 
-        self.flow = {p: {(u, v): 0.0 for u, v in G.edges()} for p in commodities}
+        # ends[p]: (source id, sink id, demand)
+        self.ends = {
+            p: (self.C.node_id(s), self.C.node_id(t), demand)
+            for p, (s, t, demand) in commodities.items()
+        }
+
+        # res[e]: capacity of edge e not used by any commodity (shared forward residual)
+        self.res = self.C.cap.tolist()
+
+        # f[p][e]: amount of flow of commodity p on edge e, same as reverse capacity
+        self.f = {p: [0.0] * self.C.m for p in commodities}
 
         # throughput[p]: pushed/satisfied need for each commodity
         self.throughput = {p: 0 for p in commodities}
 
-    def edge_used_cap(self, u, v):
-        # compute the total capacities of edge (u, v) used by all commodities
-        return sum(self.flow[p][(u, v)] for p in self.flow)
+        self.paths = {p: [] for p in commodities} if record_paths else None
 
-    def build_residual_graph(self, p):
-        # builds a residual graph
-        R = nx.DiGraph()
-        R.add_nodes_from(self.G.nodes())
+        # FlowResult built on first access of self.flow, dropped by augment()
+        self._flow = None
 
-        # forward edges
-        for u, v in self.G.edges():
-            forward_cap = self.G[u][v]["capacity"] - self.edge_used_cap(u, v)
-            if forward_cap > 0:
-                R.add_edge(u, v, capacity=forward_cap, weight=1)
+        # visitation arrays are per thread, so batched thread searches can share it
+        self.search = BidirectionalSearch(self.C)
 
-        # backward edges (per commodity)
-        for u, v in self.G.edges():
-            backward_cap = self.flow[p][(u, v)]
-            if backward_cap > 0:
-                # this undoes flow for commodity p only
-                R.add_edge(v, u, capacity=backward_cap, weight=1)
+        # budget state, see run()
+        self.iterations = 0
+        self.status = None
+        self.deadline = None
+        self.max_iterations = None
+        self.callback = None
+        self._upper_bound = None
 
-        return R
+        # commodities source_tree_round found cut off; valid until an augmentation
+        # frees shared capacity (uses a backward arc)
+        self._retired = set()
 
-    def find_path(self, p):
-        # find a path from commodity p's source to sink
-        s, t, _ = self.commodities[p]
-        R = self.build_residual_graph(p)
+    @property
+    def flow(self):
+        # FlowResult with node labels
+        if self._flow is None:
+            self._flow = self.flow_result()
+        return self._flow
 
-        try:
-            return nx.shortest_path(R, s, t, weight="weight") 
-        except nx.NetworkXNoPath:
-            return None
+    def flow_result(self):
+        # compact K x E result straight from the per-commodity edge arrays
+        keys = list(self.commodities)
+        data = np.array([self.f[p] for p in keys], dtype=float).reshape(len(keys), self.C.m)
+        return FlowResult(keys, self.C.edge_labels(), data)
 
-    def augment(self, p, path):
-        _, _, demand = self.commodities[p]
+    def saturated_report(self):
+        """
+        Which saturated links block which commodities (call after run())
 
-        # compute bottleneck capacity of input path
-        caps = []
-        for i in range(len(path) - 1):
-            u, v = path[i], path[i + 1]
+        A commodity p that is short of its demand is cut off from its sink; the
+        saturated edges leaving the set of nodes p can still reach form p's cut.
+        One BFS per commodity: O(K * E).
 
-            if (u, v) in self.G.edges():
-                # forward edge
-                caps.append(self.G[u][v]["capacity"] - self.edge_used_cap(u, v))
-            else:
-                # backward edge
-                caps.append(self.flow[p][(v, u)])
+        Output:
+        - Dict[(u, v), List[str]] -> saturated edge to the commodities it blocks
+          (saturated edges blocking nobody map to [])
+        """
+        C = self.C
+        blocked = {e: [] for e in range(C.m) if self.res[e] < EPS}
+
+        for p, (s, t, demand) in self.ends.items():
+            if self.throughput[p] >= demand:
+                continue
+            reach = reachable(C, s, self.res, self.f[p])
+            if t in reach:
+                # run() stopped early, p is not cut off yet
+                continue
+            for u in reach:
+                for e in C.out_edges[u]:
+                    if C.heads[e] not in reach and e in blocked:
+                        blocked[e].append(p)
+
+        return {C.edge_label(e): ps for e, ps in blocked.items()}
 
+    def find_path(self, p, res=None, cut=None):
+        # find a path from commodity p's source to sink, optionally against a snapshot;
+        # on failure the blocked edges separating them are added to `cut` if given
+        s, t, _ = self.ends[p]
+        return self.search.path(s, t, self.res if res is None else res, self.f[p], cut=cut)
+
+    def augment(self, p, path):
+        _, _, demand = self.ends[p]
+        flow_p = self.f[p]
+
+        # compute bottleneck capacity of input path
         # should not exceed remaining demand of p
-        bottleneck = min(min(caps), demand - self.throughput[p])
+        bottleneck = min(
+            min(self.res[e] if forward else flow_p[e] for e, forward in path),
+            demand - self.throughput[p],
+        )
+        if bottleneck <= 0:
+            # path went stale (e.g. committed after a batched search)
+            return 0
 
         # apply augmentation
-        for i in range(len(path) - 1):
-            u, v = path[i], path[i + 1]
-
-            if (u, v) in self.G.edges(): 
+        forward_only = True
+        for e, forward in path:
+            if forward:
                 # forward: add to flow
-                self.flow[p][(u, v)] += bottleneck
-            else:  
+                flow_p[e] += bottleneck
+                self.res[e] -= bottleneck
+            else:
                 # backward: undo flow
-                self.flow[p][(v, u)] -= bottleneck
+                flow_p[e] -= bottleneck
+                self.res[e] += bottleneck
+                forward_only = False
+
+        if self.paths is not None and self.paths[p] is not None:
+            if forward_only:
+                self.paths[p].append((self.C.label_path(path), bottleneck))
+            else:
+                self.paths[p] = None
 
         self.throughput[p] += bottleneck
+        self._flow = None
+
+        self.iterations += 1
+        if self.callback is not None:
+            self.callback(self.iterations, sum(self.throughput.values()))
         return bottleneck
 
-    def run(self):
-        order = list(self.commodities.keys())
+    def out_of_budget(self):
+        # checked between augmentations; sets status when a limit fires
+        if self.max_iterations is not None and self.iterations >= self.max_iterations:
+            self.status = "iteration_limit"
+        elif self.deadline is not None and time.perf_counter() >= self.deadline:
+            self.status = "time_limit"
+        return self.status is not None
 
-        while True:
-            moved = False
+    def upper_bound(self):
+        # best known upper bound on the total throughput (cut-based, cached)
+        if self._upper_bound is None:
+            self._upper_bound = throughput_upper_bound(self.C, self.commodities)
+        return self._upper_bound
+
+    def gap(self):
+        # how far the current total throughput may be from optimal
+        return self.upper_bound() - sum(self.throughput.values())
+
+    def batched_round(self, order, pool, state=None):
+        """
+        One round over all unsatisfied commodities:
+        1. search paths in parallel against a read-only snapshot of used capacities
+        2. commit them in `order`, rechecking each bottleneck against the live state
+
+        state: the process pool's SharedArray; the snapshot is written to it once per
+        round (plus the flow rows of commodities that augmented since the last one),
+        so a task is just (round, commodity row, source, sink)
+        """
+        pending = [p for p in order if self.throughput[p] < self.ends[p][2]]
+        if not pending:
+            return False
+
+        if state is not None:
+            arr = state.array
+            arr[0] = self.res
+            for p in self._dirty:
+                arr[1 + self._row[p]] = self.f[p]
+            self._dirty.clear()
+            self._round += 1
+
+            tasks = [(self._round, self._row[p], *self.ends[p][:2]) for p in pending]
+            chunk = max(1, len(tasks) // (4 * self._workers))
+            paths = list(pool.map(_worker_find_path, tasks, chunksize=chunk))
+        else:
+            res = list(self.res)
+            paths = list(pool.map(lambda p: self.find_path(p, res), pending))
+
+        moved = False
+        for p, path in zip(pending, paths):
+            if self.out_of_budget():
+                return False
+            if not path:
+                continue
+            # earlier commits in this round may have shrunk or closed the path
+            if self.augment(p, path) > 0:
+                moved = True
+                if state is not None:
+                    self._dirty.add(p)
+
+        return moved
+
+    def run_batched(self, order, max_workers=None, executor="process"):
+        """
+        Batched rounds until none moves flow
+        - "process": searches run in parallel in workers attached to a SharedGraph
+          and to a SharedArray of the round state
+        - "thread": the pure-Python searches take turns on the GIL, so this only
+          batches the work (same snapshot semantics), it does not run in parallel
+        """
+        if executor != "process":
+            with ThreadPoolExecutor(max_workers) as pool:
+                while self.batched_round(order, pool):
+                    pass
+            return
+
+        # workers attach to the graph and to the round state once; every flow row
+        # starts dirty (run() may resume from a given flow)
+        self._row = {p: k for k, p in enumerate(order)}
+        self._dirty = set(order)
+        self._round = 0
+        self._workers = max_workers or os.cpu_count() or 1
+        shared = SharedGraph.create(self.C)
+        state = SharedArray.create((len(order) + 1, self.C.m))
+        try:
+            with ProcessPoolExecutor(
+                max_workers, initializer=_init_worker, initargs=(shared.handle(), state.handle())
+            ) as pool:
+                while self.batched_round(order, pool, state):
+                    pass
+        finally:
+            state.close()
+            shared.close()
+
+    def source_tree_round(self, order):
+        """
+        One round where commodities sharing a source share one BFS tree:
+        - the tree is grown over the shared forward residual arcs only, and stops
+          once every sink of the group is reached
+        - each commodity of the group reads its sink path off the tree; a group of
+          one uses its own (bidirectional) find_path instead
+        - repair: a commodity falls back to its own find_path when the tree misses
+          its sink while it has flow (its backward arcs may open a path) or when
+          earlier commits of the round closed the tree path
+        - a commodity without any path is retired until an augmentation frees
+          shared capacity, so groups whose sinks are all cut off build no tree
+        """
+        groups = {}
+        for p in order:
+            s, _, demand = self.ends[p]
+            if self.throughput[p] < demand and p not in self._retired:
+                groups.setdefault(s, []).append(p)
+
+        moved = False
+        for s, group in groups.items():
+            tree = None
+            if len(group) > 1:
+                tree = bfs_tree(self.C, s, self.res, targets=[self.ends[p][1] for p in group])
+
+            for p in group:
+                if self.out_of_budget():
+                    return False
+                _, t, _ = self.ends[p]
+
+                path = None if tree is None else tree_path(self.C, tree, t)
+                if path is None and (tree is None or self.throughput[p] > 0):
+                    path = self.find_path(p)
 
-            # find augmenting path for each commodity 
-            for p in order:
-                # skip if p is satisfied
-                _, _, demand = self.commodities[p]
-                if self.throughput[p] == demand:
-                    continue
-                
-                # find a path for commodity p
-                path = self.find_path(p)
                 if not path:
+                    self._retired.add(p)
                     continue
 
-                # augment
                 sent = self.augment(p, path)
+                if sent <= 0:
+                    # tree path went stale in this round
+                    path = self.find_path(p)
+                    sent = self.augment(p, path) if path else 0
+                    if not path:
+                        self._retired.add(p)
+
                 if sent > 0:
                     moved = True
+                    if not all(forward for _, forward in path):
+                        self._retired.clear()
 
-            if not moved:
-                break
+        return moved
 
+    def run(self, batched=False, max_workers=None, executor="process", share_trees=False,
+            time_limit=None, max_iterations=None, callback=None, policy="fifo"):
+        """
+        batched: search all commodities of a round in parallel (executor: "process",
+        the default, or "thread") and commit the paths in commodity order, instead of
+        one at a time; see run_batched() (threads only batch, they gain no speed)
+        share_trees: one BFS tree per source per round, shared by all its commodities
+        policy: order of the (default) sequential scheduler, a name in POLICIES or a
+        callable key(ff, p) -> smallest served first; see run_scheduled()
+        time_limit (seconds) / max_iterations (augmentations): stop early and return the
+        current (feasible) flow; self.status tells which limit fired, upper_bound() and
+        gap() bound the distance to optimal
+        callback(iterations, total_throughput): called after every augmentation
+        """
+        order = list(self.commodities.keys())
+
+        self.status = None
+        self.deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self.max_iterations = max_iterations
+        self.callback = callback
+
+        if batched:
+            self.run_batched(order, max_workers, executor)
+        elif share_trees:
+            while self.source_tree_round(order):
+                pass
+        else:
+            self.run_scheduled(order, POLICIES[policy] if isinstance(policy, str) else policy)
+
+        if self.status is None:
+            self.status = "complete"
         return self.flow, self.throughput
+
+    def run_scheduled(self, order, key):
+        """
+        Event-driven sequential loop:
+        - active commodities wait in a heap by key(self, p), FIFO among equal keys;
+          the popped one augments once and is pushed back while unsatisfied
+        - a commodity without a path is retired together with the saturated edges
+          its failed search found separating source and sink. Its own flow is frozen
+          meanwhile, so only shared capacity freed on one of them, i.e. another
+          commodity augmenting backward over it, can reopen a path; it is re-queued
+          exactly then
+        Searches: one per augmentation plus one per retirement, instead of one per
+        unsatisfied commodity per round.
+        """
+        heap = []
+        seq = itertools.count()
+
+        def push(p):
+            heapq.heappush(heap, (key(self, p), next(seq), p))
+
+        for p in order:
+            if self.throughput[p] < self.ends[p][2]:
+                push(p)
+
+        # cut[p]: edge ids of retired p's cut, watchers[e]: retired commodities cut at e
+        cut = {}
+        watchers = {}
+
+        while heap:
+            if self.out_of_budget():
+                return
+            _, _, p = heapq.heappop(heap)
+
+            blocked = []
+            path = self.find_path(p, cut=blocked)
+            if not path:
+                cut[p] = blocked
+                for e in blocked:
+                    watchers.setdefault(e, set()).add(p)
+                continue
+
+            self.augment(p, path)
+            if self.throughput[p] < self.ends[p][2]:
+                push(p)
+
+            # backward edges handed capacity back to the shared residual
+            for e, forward in path:
+                if forward or e not in watchers:
+                    continue
+                for q in watchers.pop(e):
+                    for e2 in cut.pop(q):
+                        if e2 != e:
+                            watchers[e2].discard(q)
+                    push(q)
@@ -0,0 +1,140 @@
+# marks the virtual sink -> source arc in decompose_flow
+_VIRTUAL = object()
+
+
+def decompose_flow(flow, source, sink, eps=1e-9):
+    """
+    Decompose an edge flow into weighted s-t paths plus cycles
+
+    The flow value F (net outflow of the source) is closed into a circulation by a
+    virtual arc sink -> source carrying F; the circulation is split into cycles and
+    every cycle through the virtual arc is an s-t path. Each extracted cycle zeroes
+    at least one edge, so there are at most E of them; per-node adjacency cursors
+    skip exhausted edges for good, so the total work is O(E * path length).
+
+    Input:
+    - flow: Dict[(u, v), float] -> flow on each edge (zeros allowed)
+    - source, sink
+
+    Output:
+    - paths: List[(List[node], float)] -> source-to-sink node paths and amounts
+    - cycles: List[(List[node], float)] -> closed node walks (first == last) and amounts
+    """
+    out = {}
+    rem = {}
+    for (u, v), f in flow.items():
+        if f > eps:
+            out.setdefault(u, []).append(v)
+            rem[(u, v)] = f
+
+    # close the flow with sink -> VIRTUAL -> source
+    value = sum(f for (u, _), f in rem.items() if u == source) - \
+        sum(f for (_, v), f in rem.items() if v == source)
+    if value > eps:
+        out.setdefault(sink, []).insert(0, _VIRTUAL)
+        out[_VIRTUAL] = [source]
+        rem[(sink, _VIRTUAL)] = value
+        rem[(_VIRTUAL, source)] = value
+
+    cursor = {u: 0 for u in out}
+
+    def next_arc(u):
+        # first out-edge of u that still carries flow
+        arcs = out.get(u)
+        if arcs is None:
+            return None
+        i = cursor[u]
+        while i < len(arcs) and rem[(u, arcs[i])] <= eps:
+            i += 1
+        cursor[u] = i
+        return arcs[i] if i < len(arcs) else None
+
+    paths = []
+    cycles = []
+
+    def cancel(walk):
+        amount = min(rem[(walk[i], walk[i + 1])] for i in range(len(walk) - 1))
+        for i in range(len(walk) - 1):
+            rem[(walk[i], walk[i + 1])] -= amount
+
+        if _VIRTUAL in walk:
+            # rotate to [VIRTUAL, source, ..., sink, VIRTUAL] and drop the virtual node
+            i = walk.index(_VIRTUAL)
+            paths.append((walk[i + 1:-1] + walk[:i], amount))
+        else:
+            cycles.append((walk, amount))
+
+    def trace(start):
+        # follow flow from start, cancelling every cycle closed on the way
+        stack = [start]
+        pos = {start: 0}
+        while True:
+            u = stack[-1]
+            v = next_arc(u)
+            if v is None:
+                if len(stack) == 1:
+                    return
+                raise ValueError(f"flow is not conserved at node {u!r}")
+            if v in pos:
+                i = pos[v]
+                cancel(stack[i:] + [v])
+                for w in stack[i + 1:]:
+                    del pos[w]
+                del stack[i + 1:]
+                continue
+            pos[v] = len(stack)
+            stack.append(v)
+
+    if _VIRTUAL in out:
+        trace(_VIRTUAL)
+    for u in out:
+        trace(u)
+
+    return paths, cycles
+
+
+def decompose_commodities(flow, commodities, eps=1e-9):
+    """
+    Input:
+    - flow: Dict[str, Dict[(u, v), float]] -> per-commodity flow (MCF engines)
+    - commodities: Dict[str, (src, dst, demand)]
+
+    Output:
+    - Dict[str, (paths, cycles)]
+    """
+    return {
+        p: decompose_flow(flow[p], s, t, eps)
+        for p, (s, t, _) in commodities.items()
+    }
+
+
+def engine_paths(engine, eps=1e-9):
+    """
+    Weighted paths of a finished FordFulkerson / FordFulkersonScaling /
+    MultiCommodityFlowFF run
+
+    Uses the paths recorded during augmentation (record_paths=True) when they are
+    still valid, i.e. no augmentation used a backward arc; otherwise decomposes
+    the final edge flow.
+
+    Output:
+    - FF engines: List[(List[node], float)]
+    - MCF engine: Dict[str, List[(List[node], float)]]
+    """
+    if hasattr(engine, "commodities"):
+        result = {}
+        flow = None
+        for p, (s, t, _) in engine.commodities.items():
+            recorded = engine.paths.get(p) if engine.paths is not None else None
+            if recorded is not None:
+                result[p] = recorded
+                continue
+            if flow is None:
+                # one K x E result for all commodities that need decomposing
+                flow = engine.flow_result()
+            result[p] = decompose_flow(flow[p], s, t, eps)[0]
+        return result
+
+    if engine.paths is not None:
+        return engine.paths
+    return decompose_flow(engine.flow, engine.s, engine.t, eps)[0]
@@ -0,0 +1,86 @@
+import numpy as np
+from collections.abc import Mapping
+
+class CommodityFlow(Mapping):
+    """
+    Read-only view of one commodity's row: (u, v) -> flow
+    """
+    def __init__(self, row, edges, edge_index):
+        self.row = row
+        self.edges = edges
+        self.edge_index = edge_index
+
+    def __getitem__(self, edge):
+        return float(self.row[self.edge_index[edge]])
+
+    def __iter__(self):
+        return iter(self.edges)
+
+    def __len__(self):
+        return len(self.edges)
+
+    def nonzero(self):
+        # (edge, flow) for edges that carry flow, without touching the zeros
+        for i in np.flatnonzero(self.row):
+            yield self.edges[i], float(self.row[i])
+
+
+class FlowResult(Mapping):
+    """
+    Per-commodity edge flows backed by one K x E NumPy array
+
+    Behaves like the old Dict[str, Dict[(u, v), float]]: result[p][(u, v)],
+    result[p].items(), iteration over commodities, ... are lazy views on the
+    array; nothing is materialized per edge until it is read.
+
+    - nonzero()   -> iterate (commodity, edge, flow) over nonzero entries only
+    - to_numpy()  -> the K x E array itself (rows follow self.commodities,
+                     columns follow self.edges), no copy
+    - to_pandas() -> DataFrame over the same array, or long-form nonzeros
+    """
+    def __init__(self, commodities, edges, data):
+        self.commodities = list(commodities)
+        self.edges = list(edges)
+        self.data = data
+
+        self.commodity_index = {p: k for k, p in enumerate(self.commodities)}
+        self.edge_index = {e: i for i, e in enumerate(self.edges)}
+
+    def __getitem__(self, p):
+        return CommodityFlow(self.data[self.commodity_index[p]], self.edges, self.edge_index)
+
+    def __iter__(self):
+        return iter(self.commodities)
+
+    def __len__(self):
+        return len(self.commodities)
+
+    def nonzero(self):
+        for k, i in zip(*np.nonzero(self.data)):
+            yield self.commodities[k], self.edges[i], float(self.data[k, i])
+
+    def to_numpy(self):
+        return self.data
+
+    def to_pandas(self, sparse=False):
+        """
+        sparse=False: K x E DataFrame over the array (index: commodity, columns: (u, v))
+        sparse=True: long-form DataFrame of nonzeros (commodity, u, v, flow)
+        """
+        import pandas as pd
+
+        if sparse:
+            ks, es = np.nonzero(self.data)
+            return pd.DataFrame({
+                "commodity": [self.commodities[k] for k in ks],
+                "u": [self.edges[i][0] for i in es],
+                "v": [self.edges[i][1] for i in es],
+                "flow": self.data[ks, es],
+            })
+
+        return pd.DataFrame(
+            self.data,
+            index=self.commodities,
+            columns=pd.MultiIndex.from_tuples(self.edges),
+            copy=False,
+        )
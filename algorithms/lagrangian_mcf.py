@@ -0,0 +1,240 @@
+import os
+import time
+import numpy as np
+from algorithms.compiled_graph import compile_graph
+from algorithms.dijkstra import dijkstra
+from algorithms.ff_mcf import MultiCommodityFlowFF
+from algorithms.flow_result import FlowResult
+from algorithms.residual_graph import ResidualGraph
+from algorithms.shared_graph import SharedGraph
+from algorithms.ssp import ssp
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# compiled graph held by each process-pool worker, set once by _init_worker
+# (attached to the parent's SharedGraph for the worker's lifetime)
+_worker_shared = None
+_worker_graph = None
+
+def _init_worker(handle):
+    global _worker_shared, _worker_graph
+    _worker_shared = SharedGraph.attach(handle)
+    _worker_graph = _worker_shared.compiled()
+
+def solve_subproblem(C, s, t, demand, lam):
+    """
+    Commodity subproblem of the relaxation: max theta - sum_e lam[e] * f[e] over
+    one commodity's flows (0 <= f <= cap, theta <= demand), i.e. min-cost flow with
+    costs lam that only uses paths cheaper than 1 per unit
+
+    Output:
+    - flow: List[float] per edge id, sent, cost (= lam . flow)
+    """
+    g = ResidualGraph(C.n)
+    for u, v, c, w in zip(C.tails, C.heads, C.cap.tolist(), lam):
+        g.add_edge(u, v, c, w)
+    sent, cost = ssp(g, s, t, dijkstra, max_flow=demand, max_unit_cost=1)
+    return g.edge_flows(), sent, cost
+
+def _worker_solve(args):
+    lam, chunk = args
+    return [solve_subproblem(_worker_graph, s, t, demand, lam) for s, t, demand in chunk]
+
+class MultiCommodityFlowLagrangian:
+    """
+    Max-throughput MCF by Lagrangian relaxation of the shared capacity constraints
+
+    With multipliers lam[e] >= 0 on sum_k f[k, e] <= cap[e], the LP splits into K
+    independent subproblems (see solve_subproblem), solved each iteration on a
+    thread / process pool. L(lam) = lam . cap + sum_k (theta_k - lam . f_k) is an
+    upper bound on the optimum; lam follows projected subgradient steps
+    (Polyak step towards the best feasible value) on g = cap - sum_k f_k.
+
+    Primal repair:
+    - every iteration, the running average of the subproblem flows (and the
+      current ones) are scaled down per commodity until no edge is overloaded
+    - every `top_up_every` iterations and at the end, the best scaled flow is
+      topped up greedily with the FF engine; the best topped-up flow is returned
+
+    Input:
+    - graph: NetworkX.DiGraph() or CompiledGraph -> directed graph
+    - commodities: Dict[str, (src, dst, demand)] -> commodity p to (source, sink, and demand)
+
+    Output:
+    - flow: FlowResult -> used capacity on each edge for each commodity
+    - throughput: Dict[str, float] -> sent/satisfied demand for each commodity
+    - self.dual_bound: best L(lam), self.lower_bound: best repaired throughput
+    """
+    def __init__(self, G, commodities):
+        self.C = compile_graph(G)
+        self.commodities = commodities
+        self.keys = list(commodities)
+        self.ends = [(self.C.node_id(s), self.C.node_id(t), demand) for s, t, demand in commodities.values()]
+
+        self.cap = self.C.cap.astype(float)
+        self.lam = np.zeros(self.C.m)
+
+        self.dual_bound = np.inf
+        self.lower_bound = 0.0
+        self.best_flow = None
+        self.best_theta = None
+        self.best_ff = None
+
+        self.iterations = 0
+        self.status = None
+
+    def solve_all(self, pool, chunks):
+        # K subproblems at the current multipliers -> (K x E flows, theta, sum of costs)
+        lam = self.lam.tolist()
+        if pool is None:
+            results = [solve_subproblem(self.C, s, t, demand, lam) for s, t, demand in self.ends]
+        else:
+            if isinstance(pool, ProcessPoolExecutor):
+                parts = pool.map(_worker_solve, [(lam, chunk) for chunk in chunks])
+            else:
+                parts = pool.map(
+                    lambda chunk: [solve_subproblem(self.C, s, t, d, lam) for s, t, d in chunk], chunks
+                )
+            results = [r for part in parts for r in part]
+
+        K, E = len(self.ends), self.C.m
+        flow = np.array([r[0] for r in results], dtype=float).reshape(K, E)
+        theta = np.array([r[1] for r in results], dtype=float)
+        cost = sum(r[2] for r in results)
+        return flow, theta, cost
+
+    def repair(self, flow, theta):
+        # scale each commodity by its worst overload ratio: sum_k a_k f[k, e] <= cap[e]
+        load = flow.sum(axis=0)
+        ratio = np.where(load > self.cap, self.cap / np.maximum(load, 1e-300), 1.0)
+        alpha = np.where(flow > 1e-12, ratio[None, :], 1.0).min(axis=1, initial=1.0)
+        return flow * alpha[:, None], theta * alpha
+
+    def keep_best(self, flow, theta):
+        flow, theta = self.repair(flow, theta)
+        if theta.sum() > self.lower_bound or self.best_flow is None:
+            self.lower_bound = float(theta.sum())
+            self.best_flow, self.best_theta = flow, theta
+
+    def top_up(self):
+        # greedy FF augmentation from the best repaired flow on the leftover capacity
+        # (from zero flow if no iteration has run yet)
+        ff = MultiCommodityFlowFF(self.C, self.commodities)
+        if self.best_flow is not None:
+            ff.res = np.maximum(self.cap - self.best_flow.sum(axis=0), 0.0).tolist()
+            for k, p in enumerate(self.keys):
+                ff.f[p] = self.best_flow[k].tolist()
+                ff.throughput[p] = float(self.best_theta[k])
+        ff.run()
+        return ff
+
+    def keep_topped_up(self):
+        # top up the best scaled flow; raises the lower bound when it beats earlier ones
+        ff = self.top_up()
+        value = sum(ff.throughput.values())
+        if self.best_ff is None or value > sum(self.best_ff.throughput.values()):
+            self.best_ff = ff
+        self.lower_bound = max(self.lower_bound, value)
+
+    def gap(self):
+        return self.dual_bound - self.lower_bound
+
+    def run(self, max_iterations=100, time_limit=None, tol=1e-4, max_workers=None, executor="process",
+            step_scale=2.0, patience=5, top_up_every=10, callback=None):
+        """
+        executor: "process", "thread", or None (serial); commodities are sent to the
+        pool in chunks, 4 per worker
+        max_iterations / time_limit: subgradient budget; status "complete" once the
+        relative gap <= tol, else "iteration_limit" / "time_limit", or "stalled" when
+        the subgradient vanishes first; with no iteration run the flow is FF's alone
+        step_scale: Polyak step factor, halved after `patience` iterations without
+        a better dual bound
+        top_up_every: top up the best scaled flow every this many iterations, so the
+        convergence test sees the topped-up lower bound (None: only at the end)
+        callback(iterations, dual_bound, lower_bound): called after every iteration
+        """
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        K = len(self.ends)
+
+        shared = None
+        if executor == "process":
+            # workers attach to the graph instead of unpickling a copy each
+            shared = SharedGraph.create(self.C)
+            pool = ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(shared.handle(),))
+        elif executor == "thread":
+            pool = ThreadPoolExecutor(max_workers)
+        else:
+            pool = None
+
+        workers = 1 if pool is None else (max_workers or os.cpu_count() or 1)
+        size = max(1, -(-K // (4 * workers)))
+        chunks = [self.ends[i:i + size] for i in range(0, K, size)]
+
+        avg_flow, avg_theta = None, None
+        stall = 0
+        self.status = "iteration_limit"
+
+        try:
+            while self.iterations < max_iterations:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    self.status = "time_limit"
+                    break
+
+                flow, theta, cost = self.solve_all(pool, chunks)
+                self.iterations += 1
+
+                # dual value and bound
+                value = float(self.lam @ self.cap) + float(theta.sum()) - cost
+                if value < self.dual_bound - 1e-9:
+                    self.dual_bound = value
+                    stall = 0
+                else:
+                    stall += 1
+                    if stall >= patience:
+                        step_scale /= 2
+                        stall = 0
+
+                # primal: running average of the subproblem flows, and the current ones
+                n = self.iterations
+                if avg_flow is None:
+                    avg_flow, avg_theta = flow, theta
+                else:
+                    avg_flow = avg_flow + (flow - avg_flow) / n
+                    avg_theta = avg_theta + (theta - avg_theta) / n
+                self.keep_best(flow, theta)
+                self.keep_best(avg_flow, avg_theta)
+                if top_up_every and self.iterations % top_up_every == 0:
+                    self.keep_topped_up()
+
+                if callback is not None:
+                    callback(self.iterations, self.dual_bound, self.lower_bound)
+
+                if self.gap() <= tol * max(1.0, self.dual_bound):
+                    self.status = "complete"
+                    break
+
+                # projected subgradient step on lam
+                g = self.cap - flow.sum(axis=0)
+                g[(self.lam <= 0) & (g > 0)] = 0
+                norm = float(g @ g)
+                if norm == 0:
+                    # no step direction left; "complete" only if the gap check passes below
+                    self.status = "stalled"
+                    break
+                step = step_scale * (value - self.lower_bound) / norm
+                self.lam = np.maximum(0.0, self.lam - step * g)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+            if shared is not None:
+                shared.close()
+
+        self.keep_topped_up()
+        # no dual bound (inf) until the first iteration
+        if self.status != "complete" and np.isfinite(self.dual_bound) and \
+                self.gap() <= tol * max(1.0, self.dual_bound):
+            self.status = "complete"
+
+        ff = self.best_ff
+
+        data = np.array([ff.f[p] for p in self.keys], dtype=float).reshape(K, self.C.m)
+        return FlowResult(self.keys, self.C.edge_labels(), data), ff.throughput
@@ -1,13 +1,18 @@
-import pulp
+import time
+import numpy as np
+from algorithms.compiled_graph import compile_graph
+from algorithms.flow_result import FlowResult
+from algorithms.mcf_bounds import throughput_upper_bound
 
 class MultiCommodityFlowLP:
     """
     Input: 
-    - graph: NetworkX.DiGraph() -> networkx directed graph
+    - graph: NetworkX.DiGraph() or CompiledGraph -> directed graph
     - commodities: Dict[str, (src, dst, demand)] -> commodity p to (source, sink, and demand)
 
     Output:
-    - flow: Dict[str, Dict[(str, str), float]] -> used capacity on each edge for each commodity
+    - flow: FlowResult -> used capacity on each edge for each commodity
+      (K x E array, indexable like Dict[str, Dict[(str, str), float]])
     - throughput: Dict[str, float] -> sent/satisfied demand for each commodity
 
     Constraints:
@@ -20,68 +25,158 @@ class MultiCommodityFlowLP:
 
     Objective:
     - maximize throughput of commodity p
+    - cost_mode="lexicographic": then, keeping the max throughput, minimize the
+      routing cost sum(cost(u, v) * flow) (edge attribute "weight"; two solves);
+      self.cost_status is the second solve's status, and if it stops without a
+      usable point the first solve's flow is returned
+    - cost_mode="weighted": one solve of throughput - cost_weight * routing cost;
+      throughput keeps priority as long as cost_weight * (costliest path) < 1
+    - self.routing_cost: routing cost of the returned flow
+
+    Budget (solve(time_limit=..., max_iterations=...)):
+    - time_limit is a wall-clock deadline from the start of solve(): model build
+      and CBC I/O count, each CBC run gets only the time left, and a stage with no
+      time left is not run (status "time_limit")
+    - max_iterations is passed to each CBC run as its simplex iteration limit
+    - self.status: "optimal", "time_limit" / "iteration_limit" when a limit fired,
+      otherwise PuLP's status string
+    - a pure LP has no MIP incumbent, so a stopped simplex may leave an infeasible
+      point; it is returned only if it satisfies all constraints, else the (always
+      feasible) zero flow is returned
+    - self.upper_bound: LP optimum if solved, else the cut-based bound
     """
-    def __init__(self, G, commodities):
-        self.G = G.copy()
+    def __init__(self, G, commodities, cost_mode=None, cost_weight=1e-3):
+        self.C = compile_graph(G)
         self.commodities = commodities
-
-    def solve(self):
-        nodes = list(self.G.nodes())
-        edges = list(self.G.edges())
+        self.cost_mode = cost_mode
+        self.cost_weight = cost_weight
+
+        self.status = None
+        self.cost_status = None
+        self.upper_bound = None
+        self.routing_cost = None
+
+    def run_cbc(self, prob, time_limit, max_iterations):
+        import pulp
+
+        options = [] if max_iterations is None else [f"maxIterations {max_iterations}"]
+        start = time.perf_counter()
+        prob.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit, options=options))
+        elapsed = time.perf_counter() - start
+
+        # PuLP maps a stopped CBC run to LpStatusOptimal; only sol_status tells them apart
+        if prob.sol_status == pulp.LpSolutionOptimal:
+            return "optimal"
+        if prob.status == pulp.LpStatusOptimal:
+            hit_time = time_limit is not None and (max_iterations is None or elapsed >= time_limit)
+            return "time_limit" if hit_time else "iteration_limit"
+        return pulp.LpStatus[prob.status]
+
+    def solve(self, time_limit=None, max_iterations=None, callback=None):
+        """
+        callback(iterations, total_throughput): CBC exposes no progress hook, so it is
+        called once with the returned solution
+        """
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+
+        # PuLP (and its solver probing) only loads once a CBC model is built
+        import pulp
+
+        C = self.C
+        edges = range(C.m)
+        keys = list(self.commodities)
+        caps = C.cap.tolist()
 
         prob = pulp.LpProblem("MultiCommodityFlow", pulp.LpMaximize)
 
-        # constraint 1
+        # constraint 1 (variables named by commodity index and edge id)
         flow = {
-            p: {
-                (u, v): pulp.LpVariable(f"f_{p}_{u}_{v}", lowBound=0)
-                for (u, v) in edges
-            }
-            for p in self.commodities
+            p: [pulp.LpVariable(f"f_{k}_{e}", lowBound=0) for e in edges]
+            for k, p in enumerate(keys)
         }
 
         # constraint 2
-        for (u, v) in edges:
-            cap = self.G[u][v]["capacity"]
-            prob += pulp.lpSum(flow[p][(u, v)] for p in self.commodities) <= cap
+        for e in edges:
+            prob += pulp.lpSum(flow[p][e] for p in keys) <= caps[e]
 
         # constraint 3
         throughput = {
-            p: pulp.LpVariable(f"theta_{p}", lowBound=0)
-            for p in self.commodities
+            p: pulp.LpVariable(f"theta_{k}", lowBound=0)
+            for k, p in enumerate(keys)
         }
         for p, (_, _, demand) in self.commodities.items():
             prob += throughput[p] <= demand
 
         # constraint 4
         for p, (s, t, demand) in self.commodities.items():
-            for node in nodes:
-                outflow = pulp.lpSum(
-                    flow[p][(node, j)]
-                    for (_node, j) in edges if _node == node
-                )
-                inflow = pulp.lpSum(
-                    flow[p][(i, node)]
-                    for (i, _node) in edges if _node == node
-                )
-
-                if node == s:
+            si, ti = C.node_id(s), C.node_id(t)
+            for node in range(C.n):
+                outflow = pulp.lpSum(flow[p][e] for e in C.out_edges[node])
+                inflow = pulp.lpSum(flow[p][e] for e in C.in_edges[node])
+
+                if node == si:
                     prob += outflow - inflow == throughput[p]
-                elif node == t:
+                elif node == ti:
                     prob += inflow - outflow == throughput[p]
                 else:
                     prob += outflow - inflow == 0
 
         # objective
-        prob += pulp.lpSum(throughput[p] for p in self.commodities)
-
-        prob.solve(pulp.PULP_CBC_CMD(msg=False))
-
-        flow_result = {
-            p: {(u, v): flow[p][(u, v)].value() for (u, v) in edges}
-            for p in self.commodities
-        }
-
-        throughput_result = {p: throughput[p].value() for p in self.commodities}
+        total = pulp.lpSum(throughput[p] for p in keys)
+        costs = C.cost.tolist()
+        routing_cost = pulp.lpSum(
+            costs[e] * flow[p][e] for p in keys for e in edges if costs[e]
+        )
+        if self.cost_mode == "weighted":
+            prob += total - self.cost_weight * routing_cost
+        else:
+            prob += total
+
+        def run_stage():
+            # CBC with the time left; (status, solved)
+            left = None if deadline is None else deadline - time.perf_counter()
+            if left is not None and left <= 0:
+                return "time_limit", False
+            return self.run_cbc(prob, left, max_iterations), True
+
+        def read(status, solved):
+            # the solver's point if it is optimal or at least feasible, else zero flow;
+            # the K x E solution goes straight into one array, no per-edge dicts
+            usable = solved and (status == "optimal" or prob.valid(eps=1e-6))
+            value = (lambda var: var.varValue or 0.0) if usable else (lambda var: 0.0)
+            K, E = len(keys), C.m
+            data = np.fromiter(
+                (value(var) for p in keys for var in flow[p]),
+                dtype=float,
+                count=K * E,
+            ).reshape(K, E)
+            return usable, data, {p: value(throughput[p]) for p in keys}
+
+        self.status, solved = run_stage()
+        self.cost_status = None
+        _, data, throughput_result = read(self.status, solved)
+
+        if self.cost_mode == "lexicographic" and self.status == "optimal":
+            # stage 2: keep the optimal throughput (relative slack), minimize routing cost
+            best = pulp.value(total)
+            prob += total >= best - 1e-9 * max(1.0, abs(best))
+            prob.sense = pulp.LpMinimize
+            prob.setObjective(routing_cost)
+            self.cost_status, solved = run_stage()
+            usable, data2, throughput2 = read(self.cost_status, solved)
+            if usable:
+                data, throughput_result = data2, throughput2
+
+        flow_result = FlowResult(keys, C.edge_labels(), data)
+
+        self.routing_cost = float(data.sum(axis=0) @ C.cost)
+
+        if self.status == "optimal" and self.cost_mode != "weighted":
+            self.upper_bound = sum(throughput_result.values())
+        else:
+            self.upper_bound = throughput_upper_bound(self.C, self.commodities)
+
+        if callback is not None:
+            callback(1, sum(throughput_result.values()))
 
         return flow_result, throughput_result
\ No newline at end of file
@@ -0,0 +1,169 @@
+import numpy as np
+import highspy
+from algorithms.compiled_graph import CompiledGraph, compile_graph
+from algorithms.flow_result import FlowResult
+from algorithms.mcf_bounds import throughput_upper_bound
+
+class PersistentMultiCommodityFlowLP:
+    """
+    Max-throughput MCF LP (same model as MultiCommodityFlowLP) built once per
+    (topology, commodity set) and kept alive in HiGHS between solves
+
+    Input:
+    - graph: NetworkX.DiGraph() or CompiledGraph -> directed graph
+    - commodities: Dict[str, (src, dst, demand)] -> commodity p to (source, sink, and demand)
+
+    Output (solve()):
+    - flow: FlowResult -> used capacity on each edge for each commodity
+    - throughput: Dict[str, float] -> sent/satisfied demand for each commodity
+
+    Model layout (fixed at construction):
+    - columns: f[k, e] at k * E + e, then theta[k] at K * E + k
+    - rows: capacity row e (sum_k f[k, e] <= cap[e]) at e, then conservation
+      row of node v for commodity k at E + k * n + v (== 0)
+    - demands are theta's column upper bounds
+
+    Re-optimization:
+    - set_capacities() / set_demands() only change row / column bounds, so the
+      previous optimal basis stays valid and the next solve() warm-starts the
+      simplex from it; the work tracks the size of the change
+    - self.iterations: simplex iterations of the last solve
+
+    Budget (solve(time_limit=..., max_iterations=...)) as in MultiCommodityFlowLP:
+    - self.status: "optimal", "time_limit" / "iteration_limit", otherwise HiGHS's
+      model status string
+    - a stopped solve's point is returned only if primal feasible, else zero flow
+    - self.upper_bound: LP optimum if solved, else the cut-based bound
+    """
+    def __init__(self, G, commodities):
+        self.C = compile_graph(G)
+        # own copy, set_demands() updates it
+        self.commodities = dict(commodities)
+        self.keys = list(commodities)
+        self.index = {p: k for k, p in enumerate(self.keys)}
+
+        self.caps = self.C.cap.astype(float)
+        self.demands = np.array([commodities[p][2] for p in self.keys], dtype=float)
+
+        self.status = None
+        self.upper_bound = None
+        self.iterations = 0
+
+        self.highs = highspy.Highs()
+        self.highs.silent()
+        self.highs.setOptionValue("solver", "simplex")
+        self.highs.passModel(self.build())
+
+    def build(self):
+        C = self.C
+        K, E, n = len(self.keys), C.m, C.n
+        inf = highspy.kHighsInf
+
+        lp = highspy.HighsLp()
+        lp.num_col_ = K * E + K
+        lp.num_row_ = E + K * n
+        lp.sense_ = highspy.ObjSense.kMaximize
+
+        # objective: total throughput
+        lp.col_cost_ = np.concatenate([np.zeros(K * E), np.ones(K)])
+        lp.col_lower_ = np.zeros(K * E + K)
+        lp.col_upper_ = np.concatenate([np.full(K * E, inf), self.demands])
+
+        lp.row_lower_ = np.concatenate([np.full(E, -inf), np.zeros(K * n)])
+        lp.row_upper_ = np.concatenate([self.caps, np.zeros(K * n)])
+
+        # column-wise matrix: every flow column has 3 entries (capacity row,
+        # +1 at its tail's conservation row, -1 at its head's), every theta 2
+        k = np.repeat(np.arange(K), E)
+        e = np.tile(np.arange(E), K)
+        offset = E + k * n
+        flow_rows = np.stack([e, offset + C.tail[e], offset + C.head[e]], axis=1)
+        flow_vals = np.tile([1.0, 1.0, -1.0], (K * E, 1))
+
+        ends = np.array(
+            [(C.node_id(s), C.node_id(t)) for s, t, _ in self.commodities.values()],
+            dtype=np.int64,
+        ).reshape(K, 2)
+        theta_rows = E + np.arange(K)[:, None] * n + ends
+        theta_vals = np.tile([-1.0, 1.0], (K, 1))
+
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = np.concatenate([
+            np.arange(0, 3 * K * E, 3),
+            3 * K * E + np.arange(0, 2 * K + 1, 2),
+        ])
+        lp.a_matrix_.index_ = np.concatenate([flow_rows.ravel(), theta_rows.ravel()])
+        lp.a_matrix_.value_ = np.concatenate([flow_vals.ravel(), theta_vals.ravel()])
+        return lp
+
+    def set_capacities(self, capacities):
+        """
+        capacities: Dict[(u, v), float] -> new capacity of each changed edge
+        """
+        C = self.C
+        rows = np.array([C.edge_id(*uv) for uv in capacities], dtype=np.int32)
+        caps = np.array(list(capacities.values()), dtype=float)
+        self.caps[rows] = caps
+        self.highs.changeRowsBounds(len(rows), rows, np.full(len(rows), -highspy.kHighsInf), caps)
+
+    def set_demands(self, demands):
+        """
+        demands: Dict[str, float] -> new demand of each changed commodity
+        """
+        ks = np.array([self.index[p] for p in demands], dtype=np.int64)
+        vals = np.array(list(demands.values()), dtype=float)
+        self.demands[ks] = vals
+
+        for p, demand in demands.items():
+            s, t, _ = self.commodities[p]
+            self.commodities[p] = (s, t, demand)
+
+        cols = (len(self.keys) * self.C.m + ks).astype(np.int32)
+        self.highs.changeColsBounds(len(cols), cols, np.zeros(len(cols)), vals)
+
+    def run_highs(self, time_limit, max_iterations):
+        h = self.highs
+        h.setOptionValue("time_limit", highspy.kHighsInf if time_limit is None else float(time_limit))
+        h.setOptionValue("simplex_iteration_limit", 2**31 - 1 if max_iterations is None else int(max_iterations))
+        h.run()
+
+        self.iterations = h.getInfo().simplex_iteration_count
+
+        status = h.getModelStatus()
+        if status == highspy.HighsModelStatus.kOptimal:
+            return "optimal"
+        if status == highspy.HighsModelStatus.kTimeLimit:
+            return "time_limit"
+        if status == highspy.HighsModelStatus.kIterationLimit:
+            return "iteration_limit"
+        return h.modelStatusToString(status)
+
+    def solve(self, time_limit=None, max_iterations=None, callback=None):
+        """
+        callback(iterations, total_throughput): called once with the returned solution
+        """
+        C = self.C
+        K, E = len(self.keys), C.m
+
+        self.status = self.run_highs(time_limit, max_iterations)
+
+        feasible = self.highs.getInfo().primal_solution_status == highspy.SolutionStatus.kSolutionStatusFeasible
+        if self.status == "optimal" or feasible:
+            x = np.asarray(self.highs.getSolution().col_value, dtype=float)
+        else:
+            x = np.zeros(K * E + K)
+
+        flow_result = FlowResult(self.keys, C.edge_labels(), x[: K * E].reshape(K, E))
+        throughput_result = dict(zip(self.keys, x[K * E :].tolist()))
+
+        if self.status == "optimal":
+            self.upper_bound = sum(throughput_result.values())
+        else:
+            # cut bound on the current capacities
+            C_now = CompiledGraph.from_arrays(C.n, C.tail, C.head, self.caps, C.cost, C.nodes)
+            self.upper_bound = throughput_upper_bound(C_now, self.commodities)
+
+        if callback is not None:
+            callback(self.iterations, sum(throughput_result.values()))
+
+        return flow_result, throughput_result
@@ -0,0 +1,226 @@
+import heapq
+import math
+import time
+import numpy as np
+import highspy
+from algorithms.compiled_graph import compile_graph
+from algorithms.flow_result import FlowResult
+
+def shortest_path_tree(C, s, length):
+    """
+    Dijkstra from s over the graph's own arcs with non-negative per-edge length
+
+    Output:
+    - dist: List[float] per node id, prev: List[edge id | -1] per node id
+    """
+    n = C.n
+    out_edges, heads = C.out_edges, C.heads
+    dist = [math.inf] * n
+    prev = [-1] * n
+    dist[s] = 0.0
+
+    heap = [(0.0, s)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for e in out_edges[u]:
+            v = heads[e]
+            nd = d + length[e]
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = e
+                heapq.heappush(heap, (nd, v))
+
+    return dist, prev
+
+class MultiCommodityFlowPathLP:
+    """
+    Max-throughput MCF LP in path form, solved by column generation in HiGHS
+
+    Restricted master: one column x[P] per (commodity, path) generated so far,
+    rows only for demands (sum of x[P] over k's paths <= demand[k]) and for the
+    capacities of edges some path uses (sum of x[P] over paths through e <= cap[e]);
+    at most E + K rows instead of the arc model's E + K * V, and both rows and
+    columns grow with the paths actually needed.
+
+    Pricing: with capacity duals pi[e] >= 0 and demand duals sigma[k] >= 0, a
+    path P of commodity k improves the master iff 1 - pi(P) - sigma[k] > 0, so
+    one Dijkstra per source (lengths pi) prices all its commodities. New columns
+    are added to the live model and the master is re-solved warm from its basis;
+    this stops when no path has positive reduced cost, at the arc LP's optimum.
+
+    Input:
+    - graph: NetworkX.DiGraph() or CompiledGraph -> directed graph
+    - commodities: Dict[str, (src, dst, demand)] -> commodity p to (source, sink, and demand)
+
+    Output (solve()):
+    - flow: FlowResult -> used capacity on each edge for each commodity
+    - throughput: Dict[str, float] -> sent/satisfied demand for each commodity
+    - self.paths[p]: List[(node label path, amount)] of commodity p's paths with flow
+    - self.upper_bound: master value + sum_k demand[k] * max(0, best reduced cost
+      of k), a valid bound in every round (equal to the optimum at the end)
+    """
+    def __init__(self, G, commodities):
+        self.C = compile_graph(G)
+        self.commodities = commodities
+        self.keys = list(commodities)
+        self.ends = [(self.C.node_id(s), self.C.node_id(t), demand) for s, t, demand in commodities.values()]
+
+        # commodity indices grouped by source id, one pricing tree each
+        self.groups = {}
+        for k, (s, _, _) in enumerate(self.ends):
+            self.groups.setdefault(s, []).append(k)
+
+        # columns: (commodity index, edge ids)
+        self.columns = []
+        # master row of each edge's capacity, -1 until a path uses the edge
+        self.row_of = [-1] * self.C.m
+
+        # duals and value of the last master solve (pricing resumes from them)
+        self.pi = [0.0] * self.C.m
+        self.sigma = [0.0] * len(self.keys)
+        self.value = 0.0
+
+        self.status = None
+        self.rounds = 0
+        self.upper_bound = None
+        self.paths = None
+
+        K = len(self.keys)
+        self.highs = highspy.Highs()
+        self.highs.silent()
+        self.highs.setOptionValue("solver", "simplex")
+        # new columns keep the basis primal feasible: continue with primal simplex
+        # from it, no presolve between rounds
+        self.highs.setOptionValue("simplex_strategy", 4)
+        self.highs.setOptionValue("presolve", "off")
+        self.highs.changeObjectiveSense(highspy.ObjSense.kMaximize)
+
+        # demand rows 0..K-1
+        self.add_rows(np.array([d for _, _, d in self.ends], dtype=float))
+
+    def add_rows(self, upper):
+        # empty "<= upper" rows; columns fill them in
+        num = len(upper)
+        self.highs.addRows(
+            num, np.full(num, -highspy.kHighsInf), upper,
+            0, np.zeros(num, dtype=np.int32), np.array([], dtype=np.int32), np.array([], dtype=float),
+        )
+
+    def price(self, pi, sigma, tol):
+        """
+        Output:
+        - List[(commodity index, edge ids)] with positive reduced cost, and
+          sum_k demand[k] * max(0, best reduced cost of k) for the bound
+        """
+        new = []
+        slack = 0.0
+        for s, ks in self.groups.items():
+            dist, prev = shortest_path_tree(self.C, s, pi)
+            for k in ks:
+                _, t, demand = self.ends[k]
+                if dist[t] == math.inf:
+                    continue
+                rc = 1.0 - dist[t] - sigma[k]
+                if rc <= tol:
+                    continue
+                slack += demand * rc
+
+                path = []
+                v = t
+                while v != s:
+                    e = prev[v]
+                    path.append(e)
+                    v = self.C.tails[e]
+                path.reverse()
+                new.append((k, path))
+        return new, slack
+
+    def add_columns(self, new):
+        # capacity rows for edges used for the first time
+        fresh = sorted({e for _, path in new for e in path if self.row_of[e] < 0})
+        if fresh:
+            first = self.highs.getNumRow()
+            for i, e in enumerate(fresh):
+                self.row_of[e] = first + i
+            self.add_rows(self.C.cap[fresh].astype(float))
+
+        row_of = self.row_of
+        starts = np.zeros(len(new), dtype=np.int32)
+        index = []
+        pos = 0
+        for i, (k, path) in enumerate(new):
+            starts[i] = pos
+            index.append(k)
+            index.extend(row_of[e] for e in path)
+            pos += len(path) + 1
+        self.highs.addCols(
+            len(new), np.ones(len(new)), np.zeros(len(new)), np.full(len(new), highspy.kHighsInf),
+            pos, starts, np.array(index, dtype=np.int32), np.ones(pos),
+        )
+        self.columns.extend(new)
+
+    def solve(self, max_rounds=None, time_limit=None, tol=1e-9, callback=None):
+        """
+        max_rounds / time_limit: pricing budget, checked between rounds; status
+        "optimal", "iteration_limit" / "time_limit" (the master's point is always
+        feasible), otherwise HiGHS's model status string
+        callback(rounds, total_throughput): called after every master solve
+        """
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        h = self.highs
+        self.status = None
+
+        while True:
+            new, slack = self.price(self.pi, self.sigma, tol)
+            self.upper_bound = self.value + slack
+            if not new:
+                self.status = "optimal"
+                break
+            if max_rounds is not None and self.rounds >= max_rounds:
+                self.status = "iteration_limit"
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                self.status = "time_limit"
+                break
+
+            self.add_columns(new)
+            h.run()
+            self.rounds += 1
+
+            model_status = h.getModelStatus()
+            if model_status != highspy.HighsModelStatus.kOptimal:
+                self.status = h.modelStatusToString(model_status)
+                break
+
+            # duals of <= rows in a max problem come out non-positive in HiGHS;
+            # edges without a row have dual 0
+            row_dual = np.abs(np.asarray(h.getSolution().row_dual, dtype=float))
+            row_of = np.asarray(self.row_of)
+            self.pi = np.where(row_of >= 0, row_dual[row_of], 0.0).tolist()
+            self.sigma = row_dual[:len(self.keys)].tolist()
+            self.value = h.getInfo().objective_function_value
+
+            if callback is not None:
+                callback(self.rounds, self.value)
+
+        return self.result()
+
+    def result(self):
+        # path flows -> K x E edge flows
+        C = self.C
+        E, K = C.m, len(self.keys)
+        x = np.asarray(self.highs.getSolution().col_value, dtype=float) if self.columns else np.zeros(0)
+
+        data = np.zeros((K, E))
+        throughput = np.zeros(K)
+        self.paths = {p: [] for p in self.keys}
+        for (k, path), amount in zip(self.columns, x.tolist()):
+            if amount <= 1e-12:
+                continue
+            data[k, path] += amount
+            throughput[k] += amount
+            self.paths[self.keys[k]].append((C.label_path([(e, True) for e in path]), amount))
+
+        return FlowResult(self.keys, C.edge_labels(), data), dict(zip(self.keys, throughput.tolist()))
@@ -0,0 +1,39 @@
+from algorithms.compiled_graph import CompiledGraph
+
+def throughput_upper_bound(G, commodities):
+    """
+    Cut-based upper bound on the total MCF throughput
+
+    Commodities that share a source s form one single-commodity flow out of s, so
+    their combined throughput is at most the max flow from s to a super sink that
+    every sink t of the group feeds with capacity = its total demand there.
+    Summing over sources bounds the total (shared capacities are ignored across
+    groups, so this is a relaxation).
+
+    Input:
+    - graph: NetworkX.DiGraph() or CompiledGraph -> directed graph
+    - commodities: Dict[str, (src, dst, demand)]
+
+    Output:
+    - float -> upper bound on sum of throughputs
+    """
+    import networkx as nx
+
+    if isinstance(G, CompiledGraph):
+        G = G.to_digraph()
+
+    groups = {}
+    for s, t, demand in commodities.values():
+        sinks = groups.setdefault(s, {})
+        sinks[t] = sinks.get(t, 0) + demand
+
+    super_sink = ("__bound_sink__",)
+    bound = 0
+    for s, sinks in groups.items():
+        H = nx.DiGraph()
+        H.add_edges_from(G.edges(data=True))
+        for t, demand in sinks.items():
+            H.add_edge(t, super_sink, capacity=demand)
+        bound += nx.maximum_flow_value(H, s, super_sink)
+
+    return bound
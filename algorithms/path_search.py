@@ -0,0 +1,192 @@
+import threading
+from collections import deque
+
+# residuals below this count as zero
+EPS = 1e-12
+
+class BidirectionalSearch:
+    """
+    Bidirectional BFS for augmenting paths on one CompiledGraph: a fewest-arc s-t
+    path over residual arcs (residual >= delta); fwd[e] / bwd[e] are edge e's
+    residual in its own direction / reversed (the flow that can be undone)
+
+    - forward from s over residual out-arcs, backward from t over residual in-arcs;
+      always the smaller frontier grows by one layer, and the search stops as soon
+      as a newly reached node was already reached from the other side
+    - visitation arrays are allocated once (per thread) and stamped with an epoch
+      counter, so a search allocates no per-node state
+    - when no path exists, one side has closed up; the arcs crossing its border are
+      all blocked (residual < delta) and separate s from t
+    """
+    def __init__(self, C):
+        self.C = C
+        self._local = threading.local()
+
+    def _arrays(self):
+        # (epoch box, forward stamp, backward stamp, forward prev arc, backward next arc)
+        arrays = getattr(self._local, "arrays", None)
+        if arrays is None:
+            n = self.C.n
+            arrays = self._local.arrays = ([0], [0] * n, [0] * n, [None] * n, [None] * n)
+        return arrays
+
+    def path(self, s, t, fwd, bwd, delta=EPS, cut=None):
+        """
+        cut: optional list, extended with the edge ids of the blocked forward arcs
+        crossing the closed side's border when no path exists
+
+        Output:
+        - List[(edge id, forward)] from s to t, or None
+        """
+        if s == t:
+            return []
+
+        C = self.C
+        out_edges, in_edges, tails, heads = C.out_edges, C.in_edges, C.tails, C.heads
+        box, fseen, bseen, fprev, bnext = self._arrays()
+        box[0] += 1
+        epoch = box[0]
+
+        fseen[s] = epoch
+        fprev[s] = None
+        bseen[t] = epoch
+        bnext[t] = None
+        front, back = [s], [t]
+        # everything reached per side, for the cut
+        fnodes, bnodes = [s], [t]
+
+        while front and back:
+            if len(front) <= len(back):
+                # forward layer: arcs u -> v
+                layer = []
+                for u in front:
+                    for e in out_edges[u]:
+                        if fwd[e] >= delta:
+                            v = heads[e]
+                            if fseen[v] != epoch:
+                                fseen[v] = epoch
+                                fprev[v] = (e, True)
+                                if bseen[v] == epoch:
+                                    return self._join(v, fprev, bnext)
+                                layer.append(v)
+                    for e in in_edges[u]:
+                        if bwd[e] >= delta:
+                            v = tails[e]
+                            if fseen[v] != epoch:
+                                fseen[v] = epoch
+                                fprev[v] = (e, False)
+                                if bseen[v] == epoch:
+                                    return self._join(v, fprev, bnext)
+                                layer.append(v)
+                front = layer
+                fnodes += layer
+            else:
+                # backward layer: arcs u -> v with v already leading to t
+                layer = []
+                for v in back:
+                    for e in in_edges[v]:
+                        if fwd[e] >= delta:
+                            u = tails[e]
+                            if bseen[u] != epoch:
+                                bseen[u] = epoch
+                                bnext[u] = (e, True)
+                                if fseen[u] == epoch:
+                                    return self._join(u, fprev, bnext)
+                                layer.append(u)
+                    for e in out_edges[v]:
+                        if bwd[e] >= delta:
+                            u = heads[e]
+                            if bseen[u] != epoch:
+                                bseen[u] = epoch
+                                bnext[u] = (e, False)
+                                if fseen[u] == epoch:
+                                    return self._join(u, fprev, bnext)
+                                layer.append(u)
+                back = layer
+                bnodes += layer
+
+        if cut is not None:
+            if not front:
+                # nothing more reachable from s: arcs leaving the forward side
+                cut.extend(e for u in fnodes for e in out_edges[u] if fseen[heads[e]] != epoch)
+            else:
+                # nothing more leads to t: arcs entering the backward side
+                cut.extend(e for v in bnodes for e in in_edges[v] if bseen[tails[e]] != epoch)
+        return None
+
+    def _join(self, meet, fprev, bnext):
+        # s -> meet from the forward arcs, then meet -> t from the backward ones
+        tails, heads = self.C.tails, self.C.heads
+        path = _trace(fprev, tails, heads, meet)
+
+        v = meet
+        while bnext[v] is not None:
+            e, forward = bnext[v]
+            path.append((e, forward))
+            v = heads[e] if forward else tails[e]
+        return path
+
+def bfs_tree(C, s, fwd, delta=EPS, targets=None):
+    """
+    BFS tree over forward residual arcs only
+    targets: optional node ids; the search stops as soon as all of them are reached
+
+    Output:
+    - Dict[node id, (edge id, True) | None] -> arc into each reached node
+    """
+    out_edges, heads = C.out_edges, C.heads
+    prev = {s: None}
+    left = None if targets is None else set(targets) - {s}
+    if left is not None and not left:
+        return prev
+    queue = deque([s])
+
+    while queue:
+        u = queue.popleft()
+        for e in out_edges[u]:
+            if fwd[e] >= delta:
+                v = heads[e]
+                if v not in prev:
+                    prev[v] = (e, True)
+                    if left is not None:
+                        left.discard(v)
+                        if not left:
+                            return prev
+                    queue.append(v)
+
+    return prev
+
+def tree_path(C, prev, t):
+    # arcs from the tree root to t, or None if t was not reached
+    if t not in prev:
+        return None
+    return _trace(prev, C.tails, C.heads, t)
+
+def reachable(C, s, fwd, bwd, delta=EPS):
+    # set of node ids reachable from s over residual arcs
+    out_edges, in_edges, tails, heads = C.out_edges, C.in_edges, C.tails, C.heads
+    seen = {s}
+    queue = deque([s])
+
+    while queue:
+        u = queue.popleft()
+        for e in out_edges[u]:
+            if fwd[e] >= delta and heads[e] not in seen:
+                seen.add(heads[e])
+                queue.append(heads[e])
+        for e in in_edges[u]:
+            if bwd[e] >= delta and tails[e] not in seen:
+                seen.add(tails[e])
+                queue.append(tails[e])
+
+    return seen
+
+def _trace(prev, tails, heads, t):
+    path = []
+    v = t
+    while prev[v] is not None:
+        e, forward = prev[v]
+        path.append((e, forward))
+        v = tails[e] if forward else heads[e]
+    path.reverse()
+    return path
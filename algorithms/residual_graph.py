@@ -9,6 +9,13 @@ class ResidualGraph:
     def __init__(self, n):
         self.n = n
         self.g = [[] for _ in range(n)]
+        # (u, index in g[u]) of every forward edge, in insertion order
+        self.edges = []
+        # node potentials kept between shortest-path calls (see dijkstra)
+        self.potential = None
+        # flattened arc arrays for vectorized shortest paths (see bellman_ford_np);
+        # its capacity mirror is kept current by push()
+        self.arc_cache = None
 
     def add_edge(self, u, v, cap, cost):
         """
@@ -16,5 +23,35 @@ class ResidualGraph:
         """
         forward = Edge(v, cap, cost, len(self.g[v]))
         reverse = Edge(u, 0, -cost, len(self.g[u]))
+        self.edges.append((u, len(self.g[u])))
         self.g[u].append(forward)
-        self.g[v].append(reverse)
\ No newline at end of file
+        self.g[v].append(reverse)
+        self.arc_cache = None
+
+    def push(self, u, i, flow):
+        """
+        send flow along arc i of u (and give it to its reverse arc); capacities
+        must change through here once arc_cache exists
+        """
+        e = self.g[u][i]
+        e.cap -= flow
+        self.g[e.to][e.rev].cap += flow
+        if self.arc_cache is not None:
+            cap, offset = self.arc_cache[5], self.arc_cache[6]
+            cap[offset[u] + i] -= flow
+            cap[offset[e.to] + e.rev] += flow
+
+    def flow(self):
+        """
+        flow on each original edge (= capacity of its reverse edge), summed over
+        parallel edges: Dict[(u, v), cap]
+        """
+        result = {}
+        for u, i in self.edges:
+            e = self.g[u][i]
+            result[(u, e.to)] = result.get((u, e.to), 0) + self.g[e.to][e.rev].cap
+        return result
+
+    def edge_flows(self):
+        # flow on each forward edge, in insertion order
+        return [self.g[self.g[u][i].to][self.g[u][i].rev].cap for u, i in self.edges]
\ No newline at end of file
@@ -0,0 +1,170 @@
+import gc
+import warnings
+import weakref
+import numpy as np
+from multiprocessing import shared_memory
+
+from algorithms.compiled_graph import CompiledGraph
+
+class SharedGraph:
+    """
+    Directed graph stored once in shared memory as integer edge arrays, so worker
+    processes can attach to it without pickling an nx.DiGraph
+
+    Layout: one block; int64 rows tail, head, then rows cap, cost of the
+    CompiledGraph's value dtype (int64, or float64 for fractional values)
+
+    Parent:
+    - sg = SharedGraph.create(G)    -> writes the arrays once (G: nx.DiGraph or CompiledGraph)
+    - sg.handle()                   -> small picklable spec to send to workers
+    - sg.close()                    -> releases and unlinks the block
+
+    Worker:
+    - sg = SharedGraph.attach(handle) -> zero-copy views onto the same block
+    - sg.compiled()                   -> CompiledGraph over the shared arrays, input for
+                                         FordFulkerson, FordFulkersonScaling,
+                                         MultiCommodityFlowFF, MultiCommodityFlowLP
+    - sg.to_digraph()                 -> the same as an nx.DiGraph
+    - sg.residual_graph()             -> input for ssp
+    - sg.close()
+
+    compiled() hands out views onto the block. close() releases the mapping at once
+    when none of them is alive; otherwise it warns (ResourceWarning) and the
+    mapping is unmapped only when the last view's arrays are gone, so a view never
+    outlives its memory (e.g. one pinned by a solver's frame, see PuLP's import).
+
+    Node labels travel in the handle (O(V)); edges (O(E)) never get pickled.
+    """
+    def __init__(self, shm, n, nodes, m, dtype, owner):
+        self.shm = shm
+        self.n = n
+        # None: labels are the ids (as in CompiledGraph)
+        self.nodes = nodes
+        self.m = m
+        self.dtype = np.dtype(dtype)
+        self.owner = owner
+        # CompiledGraphs handed out by compiled(), see close()
+        self._views = weakref.WeakSet()
+
+        self.tail, self.head = np.ndarray((2, m), dtype=np.int64, buffer=shm.buf)
+        self.cap, self.cost = np.ndarray((2, m), dtype=self.dtype, buffer=shm.buf, offset=2 * m * 8)
+
+    @classmethod
+    def create(cls, G, capacity="capacity", weight="weight"):
+        C = G if isinstance(G, CompiledGraph) else CompiledGraph.from_networkx(G, capacity, weight)
+        m = C.m
+        dtype = np.result_type(C.cap, C.cost)
+
+        # at least one byte, SharedMemory rejects size 0
+        shm = shared_memory.SharedMemory(create=True, size=max(1, 4 * m * 8))
+        sg = cls(shm, C.n, C.nodes, m, dtype.str, owner=True)
+
+        sg.tail[:] = C.tail
+        sg.head[:] = C.head
+        sg.cap[:] = C.cap
+        sg.cost[:] = C.cost
+        return sg
+
+    @classmethod
+    def attach(cls, handle):
+        name, n, nodes, m, dtype = handle
+        # workers started by multiprocessing share the parent's resource tracker,
+        # so only the owner's unlink() removes the block
+        shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, n, nodes, m, dtype, owner=False)
+
+    def handle(self):
+        return (self.shm.name, self.n, self.nodes, self.m, self.dtype.str)
+
+    def node_label(self, i):
+        return i if self.nodes is None else self.nodes[i]
+
+    def close(self):
+        if self.shm is None:
+            return
+        # views must be dropped before the buffer can be released
+        self.tail = self.head = self.cap = self.cost = None
+        if len(self._views):
+            # engines caught in reference cycles only go with gc
+            gc.collect()
+        if len(self._views):
+            warnings.warn(
+                f"{len(self._views)} CompiledGraph(s) from compiled() still use the shared "
+                "block; it is unmapped once they are gone",
+                ResourceWarning, stacklevel=2,
+            )
+            # leave the mapping to the views' arrays: they reference the memoryview,
+            # which references the mmap, so it is unmapped when the last one dies
+            self.shm._buf = None
+            self.shm._mmap = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def compiled(self):
+        # the edge arrays are used in place; only the engines' adjacency lists are built
+        C = CompiledGraph.from_arrays(self.n, self.tail, self.head, self.cap, self.cost, self.nodes)
+        self._views.add(C)
+        return C
+
+    def to_digraph(self):
+        return self.compiled().to_digraph()
+
+    def residual_graph(self):
+        # node i of the ResidualGraph is node id i
+        return self.compiled().residual_graph()
+
+
+class SharedArray:
+    """
+    One numpy array in shared memory, e.g. per-round state that pool workers read
+    in place instead of receiving a pickled copy with every task
+
+    - SharedArray.create(shape, dtype) -> zero-filled, owned (close() unlinks)
+    - SharedArray.attach(handle)       -> the same memory in a worker
+    - self.array: the view; close() drops it, copies must not outlive the handle
+    """
+    def __init__(self, shm, shape, dtype, owner):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.owner = owner
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+
+    @classmethod
+    def create(cls, shape, dtype=np.float64):
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+        sa = cls(shm, shape, dtype, owner=True)
+        sa.array.fill(0)
+        return sa
+
+    @classmethod
+    def attach(cls, handle):
+        name, shape, dtype = handle
+        return cls(shared_memory.SharedMemory(name=name), shape, dtype, owner=False)
+
+    def handle(self):
+        return (self.shm.name, self.shape, self.dtype.str)
+
+    def close(self):
+        if self.shm is None:
+            return
+        self.array = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,19 +1,25 @@
 from algorithms.residual_graph import ResidualGraph
 import math
 
-def ssp(graph, s, t, sp):
+def ssp(graph, s, t, sp, max_flow=math.inf, max_unit_cost=math.inf):
+    """
+    max_flow: stop once this much flow is sent (e.g. a commodity's demand)
+    max_unit_cost: stop once the cheapest path costs at least this much per unit
+    """
     total_flow = 0
     total_cost = 0
 
-    while True:
+    while total_flow < max_flow:
         sp_result = sp(graph, s, t)
         if sp_result is None:
             break
 
         dist, prev_node, prev_edge = sp_result
+        if dist[t] >= max_unit_cost:
+            break
         
         # find bottleneck
-        flow = math.inf
+        flow = max_flow - total_flow
         v = t
         while v != s:
             u = prev_node[v]
@@ -25,9 +31,7 @@ def ssp(graph, s, t, sp):
         v = t
         while v != s:
             u = prev_node[v]
-            e = graph.g[u][prev_edge[v]]
-            e.cap -= flow
-            graph.g[v][e.rev].cap += flow
+            graph.push(u, prev_edge[v], flow)
             v = u
 
         total_flow += flow
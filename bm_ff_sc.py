@@ -1,11 +1,10 @@
 import time
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 
 from generators.mcf_generators import generate_layered_graph
 from algorithms.ff import FordFulkerson
 from algorithms.ff_scaling import FordFulkersonScaling
+from algorithms.compiled_graph import compile_graph
 
 
 def run(
@@ -24,14 +23,17 @@ def run(
                 cap_high=20
             )
 
+            # compile once, shared by both engines
+            C = compile_graph(G)
+
             # FF 
-            ff = FordFulkerson(G, s, t)
+            ff = FordFulkerson(C, s, t)
             start = time.perf_counter()
             _, total_ff, aug_ff = ff.run()
             t_ff = time.perf_counter() - start
 
             # FF-scaling
-            sc = FordFulkersonScaling(G, s, t)
+            sc = FordFulkersonScaling(C, s, t)
             start = time.perf_counter()
             _, total_sc, aug_sc = sc.run()
             t_sc = time.perf_counter() - start
@@ -63,6 +65,9 @@ def run(
 
 
 def plot(df):
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(8, 6))
     sns.lineplot(data=df, x="width", y="runtime", hue="algo", marker="o")
     plt.title("FF vs FF-scaling Runtime")
@@ -1,11 +1,10 @@
 import time
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
 
 from generators.mcf_generators import generate_layered_graph_heavytail
 from algorithms.ff import FordFulkerson
 from algorithms.ff_scaling import FordFulkersonScaling
+from algorithms.compiled_graph import compile_graph
 
 def run(
     widths,
@@ -31,14 +30,17 @@ def run(
                 big_ratio=big_ratio
             )
 
+            # compile once, shared by both engines
+            C = compile_graph(G)
+
             # FF
-            ff = FordFulkerson(G, s, t)
+            ff = FordFulkerson(C, s, t)
             start = time.perf_counter()
             _, total_ff, aug_ff = ff.run()
             t_ff = time.perf_counter() - start
 
             # FF-scaling
-            sc = FordFulkersonScaling(G, s, t)
+            sc = FordFulkersonScaling(C, s, t)
             start = time.perf_counter()
             _, total_sc, aug_sc = sc.run()
             t_sc = time.perf_counter() - start
@@ -69,6 +71,9 @@ def run(
 
 
 def plot(df):
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(8, 6))
     sns.lineplot(data=df, x="width", y="runtime", hue="algo", marker="o")
     plt.title("FF vs FF-scaling Runtime (Heavy-Tail)")
@@ -0,0 +1,132 @@
+import time
+import random
+import statistics
+from algorithms.lp_mcf import MultiCommodityFlowLP
+from algorithms.lp_mcf_highs import PersistentMultiCommodityFlowLP
+from algorithms.compiled_graph import compile_graph
+from generators.mcf_generators import generate_random_commodities, generate_random_graph
+
+def make_instance(num_nodes, num_commodities, edge_prob, cap_min, cap_max, demand_min, demand_max):
+    while True:
+        G = generate_random_graph(num_nodes=num_nodes, edge_prob=edge_prob, cap_min=cap_min, cap_max=cap_max)
+        if G is None:
+            continue
+        commodities = generate_random_commodities(
+            G, num_commodities=num_commodities, demand_min=demand_min, demand_max=demand_max,
+        )
+        if commodities is not None:
+            return G, commodities
+
+def benchmark(num_nodes, num_commodities, edge_prob=0.1, cap_min=5, cap_max=20, demand_min=5, demand_max=20,
+              rounds=10, changed_edges=3, changed_demands=1):
+    """
+    One topology, `rounds` re-optimizations; each round changes a few capacities
+    and demands, then the LP is re-solved three ways:
+    - cold CBC: MultiCommodityFlowLP, model rebuilt
+    - cold HiGHS: a fresh PersistentMultiCommodityFlowLP (same solver as warm)
+    - warm HiGHS: the persistent model, bounds updated in place
+    cold vs warm HiGHS isolates the warm start from the solver change
+
+    Output:
+    - dict of mean times / iterations
+    """
+    print(f"=== Re-solve: Nodes={num_nodes}, Commodities={num_commodities}, "
+          f"changed edges={changed_edges}, demands={changed_demands} ===")
+    G, commodities = make_instance(num_nodes, num_commodities, edge_prob, cap_min, cap_max, demand_min, demand_max)
+    edges = list(G.edges())
+
+    t0 = time.perf_counter()
+    lp = PersistentMultiCommodityFlowLP(G, commodities)
+    lp.solve()
+    first_time = time.perf_counter() - t0
+    first_iterations = lp.iterations
+
+    cold_times = []
+    highs_times = []
+    highs_iterations = []
+    warm_times = []
+    warm_iterations = []
+
+    for i in range(rounds):
+        capacities = {uv: random.randint(cap_min, cap_max) for uv in random.sample(edges, changed_edges)}
+        demands = {p: random.randint(demand_min, demand_max) for p in random.sample(list(commodities), changed_demands)}
+
+        for (u, v), c in capacities.items():
+            G[u][v]["capacity"] = c
+        for p, d in demands.items():
+            s, t, _ = commodities[p]
+            commodities[p] = (s, t, d)
+
+        C = compile_graph(G)
+
+        t1 = time.perf_counter()
+        _, cold_tp = MultiCommodityFlowLP(C, commodities).solve()
+        t2 = time.perf_counter()
+
+        fresh = PersistentMultiCommodityFlowLP(C, commodities)
+        _, highs_tp = fresh.solve()
+        t3 = time.perf_counter()
+
+        lp.set_capacities(capacities)
+        lp.set_demands(demands)
+        _, warm_tp = lp.solve()
+        t4 = time.perf_counter()
+
+        cold_times.append(t2 - t1)
+        highs_times.append(t3 - t2)
+        highs_iterations.append(fresh.iterations)
+        warm_times.append(t4 - t3)
+        warm_iterations.append(lp.iterations)
+
+        cold_total, highs_total, warm_total = (sum(tp.values()) for tp in (cold_tp, highs_tp, warm_tp))
+        print(
+            f"  round {i+1}/{rounds} — cold CBC: {t2-t1:.4f}s, cold HiGHS: {t3-t2:.4f}s "
+            f"({fresh.iterations} it), warm HiGHS: {t4-t3:.4f}s ({lp.iterations} it), "
+            f"LP={cold_total:.1f}, warm={warm_total:.1f}"
+        )
+        assert abs(cold_total - warm_total) < 1e-5
+        assert abs(highs_total - warm_total) < 1e-5
+
+    print("\n=== Summary ===")
+    print(f"First solve (build + cold) : {first_time:.4f} s, {first_iterations} iterations")
+    print(f"Avg cold re-solve (CBC)    : {statistics.mean(cold_times):.4f} s")
+    print(f"Avg cold re-solve (HiGHS)  : {statistics.mean(highs_times):.4f} s, "
+          f"{statistics.mean(highs_iterations):.1f} iterations")
+    print(f"Avg warm re-solve (HiGHS)  : {statistics.mean(warm_times):.4f} s, "
+          f"{statistics.mean(warm_iterations):.1f} iterations")
+    print(f"Speedup warm start (cold/warm HiGHS): {statistics.mean(highs_times)/statistics.mean(warm_times):.1f} x")
+    print(f"Speedup total (cold CBC/warm HiGHS) : {statistics.mean(cold_times)/statistics.mean(warm_times):.1f} x")
+    print("==========================================\n")
+
+    return {
+        "cold_cbc": statistics.mean(cold_times),
+        "cold_highs": statistics.mean(highs_times),
+        "cold_iterations": statistics.mean(highs_iterations),
+        "warm_highs": statistics.mean(warm_times),
+        "warm_iterations": statistics.mean(warm_iterations),
+    }
+
+if __name__ == "__main__":
+    random.seed(42)
+
+    cfg = [
+        (20, 5),
+        (40, 10),
+        (80, 20),
+    ]
+
+    for num_nodes, num_commodities in cfg:
+        benchmark(num_nodes=num_nodes, num_commodities=num_commodities, edge_prob=0.1, rounds=10)
+
+    # warm re-solve work vs size of the change, one topology (same seed each time)
+    sweep = []
+    for changed in [1, 4, 16, 64]:
+        random.seed(7)
+        sweep.append((changed, benchmark(num_nodes=80, num_commodities=20, edge_prob=0.1, rounds=5,
+                                         changed_edges=changed, changed_demands=max(1, changed // 4))))
+
+    print("=== Warm re-solve vs change size (80 nodes, 20 commodities) ===")
+    print("changed edges | cold HiGHS s (it) | warm HiGHS s (it)")
+    for changed, r in sweep:
+        print(f"{changed:>13} | {r['cold_highs']:.4f} ({r['cold_iterations']:.0f}) | "
+              f"{r['warm_highs']:.4f} ({r['warm_iterations']:.0f})")
@@ -1,11 +1,113 @@
+import os
+import signal
 import time
 import statistics
 import random
+import multiprocessing as mp
+from multiprocessing.connection import wait
 from algorithms.ff_mcf import MultiCommodityFlowFF
 from algorithms.lp_mcf import MultiCommodityFlowLP
+from algorithms.ssp_mcf import MultiCommodityFlowSSP
+from algorithms.compiled_graph import compile_graph
+from algorithms.shared_graph import SharedGraph
 from generators.mcf_generators import generate_random_commodities, generate_random_graph
 
-def run_one_instance(num_nodes, num_commodities, edge_prob, cap_min, cap_max, demand_min, demand_max):
+# per-solver wall-clock limits (seconds) for one trial
+TIME_LIMITS = {"lp": 60.0, "ff": 60.0, "ssp": 60.0}
+
+RESULTS = "results/results_mcf_runs.csv"
+
+def solve_lp(C, commodities):
+    # LP: max throughput, then min routing cost
+    lp = MultiCommodityFlowLP(C, commodities, cost_mode="lexicographic")
+    _, tp = lp.solve()
+    return {"total": sum(tp.values()), "cost": lp.routing_cost}
+
+def solve_ff(C, commodities):
+    _, tp = MultiCommodityFlowFF(C, commodities).run()
+    return {"total": sum(tp.values()), "cost": None}
+
+def solve_ssp(C, commodities):
+    # SSP heuristic (min-cost routing per commodity)
+    h = MultiCommodityFlowSSP(C, commodities)
+    _, tp = h.run()
+    return {"total": sum(tp.values()), "cost": h.cost}
+
+SOLVERS = {"lp": solve_lp, "ff": solve_ff, "ssp": solve_ssp}
+
+def _solver_process(conn, name, handle, commodities):
+    # own process group, so a timeout also takes down children such as CBC
+    os.setsid()
+    # the graph is read in place from the parent's shared block; the result is
+    # sent before detaching, so nothing in the detach can turn it into a failure
+    with SharedGraph.attach(handle) as sg:
+        try:
+            start = time.perf_counter()
+            result = SOLVERS[name](sg.compiled(), commodities)
+            result["time"] = time.perf_counter() - start
+            result["status"] = "ok"
+        except Exception as exc:
+            result = {"status": "error", "error": repr(exc)}
+        conn.send(result)
+        conn.close()
+
+def _kill_group(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        proc.kill()
+
+def run_solvers(C, commodities, time_limits=TIME_LIMITS):
+    """
+    Run every solver of SOLVERS concurrently, each in its own supervised subprocess
+
+    A solver still running at its wall-clock limit is killed with its whole process
+    group; one that dies without answering is a failure. Either way it gets an
+    explicit result instead of stalling the sweep.
+
+    The graph is written once to a SharedGraph that every solver attaches to.
+
+    Output:
+    - Dict[name, {"status": "ok" | "timeout" | "error", "time", "total", "cost", ...}]
+    """
+    with SharedGraph.create(C) as sg:
+        return _supervise(sg.handle(), commodities, time_limits)
+
+def _supervise(handle, commodities, time_limits):
+    running = {}
+    start = time.perf_counter()
+    for name in SOLVERS:
+        recv, send = mp.Pipe(duplex=False)
+        proc = mp.Process(target=_solver_process, args=(send, name, handle, commodities), daemon=True)
+        proc.start()
+        send.close()
+        running[recv] = (name, proc)
+
+    results = {}
+    while running:
+        now = time.perf_counter()
+        deadline = min(start + time_limits[name] for name, _ in running.values())
+        for conn in wait(list(running), timeout=max(0.0, deadline - now)):
+            name, proc = running.pop(conn)
+            try:
+                results[name] = conn.recv()
+                proc.join()
+            except EOFError:
+                proc.join()
+                results[name] = {"status": "error", "error": f"exit code {proc.exitcode}"}
+
+        now = time.perf_counter()
+        for conn, (name, proc) in list(running.items()):
+            if now >= start + time_limits[name]:
+                _kill_group(proc)
+                proc.join()
+                del running[conn]
+                results[name] = {"status": "timeout", "time": time_limits[name]}
+
+    return results
+
+def run_one_instance(num_nodes, num_commodities, edge_prob, cap_min, cap_max, demand_min, demand_max,
+                     cost_min=1, cost_max=10, time_limits=TIME_LIMITS):
     # guarantee one valid graph and one valid commodities
     while True:
         G = generate_random_graph(
@@ -13,6 +115,8 @@ def run_one_instance(num_nodes, num_commodities, edge_prob, cap_min, cap_max, de
             edge_prob=edge_prob,
             cap_min=cap_min,
             cap_max=cap_max,
+            cost_min=cost_min,
+            cost_max=cost_max,
         )
         if G is None:
             continue
@@ -28,60 +132,104 @@ def run_one_instance(num_nodes, num_commodities, edge_prob, cap_min, cap_max, de
 
         break
 
-    # LP
-    lp = MultiCommodityFlowLP(G, commodities)
-    t0 = time.perf_counter()
-    _, lp_tp = lp.solve()
-    t1 = time.perf_counter()
-    lp_time = t1 - t0
-    lp_total = sum(lp_tp[p] for p in commodities)
-
-    # FF
-    h = MultiCommodityFlowFF(G, commodities)
-    t2 = time.perf_counter()
-    _, ff_tp = h.run()
-    t3 = time.perf_counter()
-    ff_time = t3 - t2
-    ff_total = sum(ff_tp[p] for p in commodities)
-
-    return lp_time, ff_time, lp_total, ff_total
-
-def benchmark(num_nodes, num_commodities, edge_prob=0.3, cap_min=5, cap_max=20, demand_min=5, demand_max=20, trials=5):
+    # compile once, shared by all solvers
+    C = compile_graph(G)
+
+    return run_solvers(C, commodities, time_limits)
+
+def benchmark(num_nodes, num_commodities, edge_prob=0.3, cap_min=5, cap_max=20, demand_min=5, demand_max=20, trials=5,
+              time_limits=TIME_LIMITS):
+    """
+    Output:
+    - List[dict]: one row per (trial, solver) with its status, time, throughput, cost
+    """
     print(f"=== Benchmark: Nodes={num_nodes}, Commodities={num_commodities} ===")
     
+    rows = []
     lp_times = []
     ff_times = []
+    ssp_times = []
     gaps = []
+    ssp_gaps = []
+    cost_gaps = []
     zero_gap_count = 0
+    compared = 0
+    wall_times = []
 
     for i in range(trials):
-        lp_time, ff_time, lp_total, ff_total = run_one_instance(
-            num_nodes, num_commodities, edge_prob, cap_min, cap_max, demand_min, demand_max
+        t0 = time.perf_counter()
+        r = run_one_instance(
+            num_nodes, num_commodities, edge_prob, cap_min, cap_max, demand_min, demand_max,
+            time_limits=time_limits,
         )
+        wall_times.append(time.perf_counter() - t0)
+
+        for name, res in r.items():
+            rows.append({
+                "num_nodes": num_nodes, "num_commodities": num_commodities, "trial": i + 1,
+                "solver": name, "status": res["status"], "time": res.get("time"),
+                "total": res.get("total"), "cost": res.get("cost"), "error": res.get("error"),
+            })
+
+        lp, ff, ssp = r["lp"], r["ff"], r["ssp"]
+        if lp["status"] == "ok":
+            lp_times.append(lp["time"])
+        if ff["status"] == "ok":
+            ff_times.append(ff["time"])
+        if ssp["status"] == "ok":
+            ssp_times.append(ssp["time"])
 
-        lp_times.append(lp_time)
-        ff_times.append(ff_time)
-        gaps.append(lp_total - ff_total)
+        # gaps only where both sides finished
+        if lp["status"] == ff["status"] == "ok":
+            compared += 1
+            gaps.append(lp["total"] - ff["total"])
+            # LP values carry solver tolerances (and the lexicographic stage's slack)
+            if abs(lp["total"] - ff["total"]) < 1e-5:
+                zero_gap_count += 1
+        if lp["status"] == ssp["status"] == "ok":
+            ssp_gaps.append(lp["total"] - ssp["total"])
+            # relative cost per unit of flow of the heuristic vs the LP's min cost:
+            # SSP often routes less flow, so total costs are not comparable
+            if lp["cost"] and ssp["total"] > 0:
+                lp_unit = lp["cost"] / lp["total"]
+                cost_gaps.append((ssp["cost"] / ssp["total"] - lp_unit) / lp_unit)
 
-        if (lp_total == ff_total):
-            zero_gap_count += 1
+        def show(res, value=None):
+            if res["status"] != "ok":
+                return res["status"]
+            return f"{res['time']:.4f}s" if value is None else f"{res[value]:.1f}"
 
         print(
-            f"  trial {i+1}/{trials} — LP: {lp_time:.4f}s, "
-            f"Modified FF: {ff_time:.4f}s, "
-            f"LP={lp_total:.1f}, FF={ff_total:.1f}, "
-            f"gap={lp_total-ff_total:.1f}"
+            f"  trial {i+1}/{trials} — LP: {show(lp)}, "
+            f"Modified FF: {show(ff)}, SSP: {show(ssp)}, "
+            f"LP={show(lp, 'total')}, FF={show(ff, 'total')}, SSP={show(ssp, 'total')}, "
+            f"cost LP={show(lp, 'cost')} SSP={show(ssp, 'cost')}"
         )
-    
+
+    def mean(xs):
+        return statistics.mean(xs) if xs else float("nan")
+
+    def failed(name):
+        return sum(row["status"] != "ok" for row in rows if row["solver"] == name)
+
     print("\n=== Summary ===")
-    print(f"Avg LP time         : {statistics.mean(lp_times):.4f} s")
-    print(f"Avg FF time         : {statistics.mean(ff_times):.4f} s")
-    print(f"Speedup (LP/FF)     : {statistics.mean(lp_times)/statistics.mean(ff_times):.1f} x")
-    print(f"Avg gap             : {statistics.mean(gaps):.3f}")
-    print(f"Min/Max gap         : {min(gaps):.3f} / {max(gaps):.3f}")
-    print(f"Zero-gap rate       : {zero_gap_count/trials:.2f}")
+    print(f"Avg LP time         : {mean(lp_times):.4f} s")
+    print(f"Avg FF time         : {mean(ff_times):.4f} s")
+    print(f"Speedup (LP/FF)     : {mean(lp_times)/mean(ff_times):.1f} x")
+    print(f"Avg gap             : {mean(gaps):.3f}")
+    if gaps:
+        print(f"Min/Max gap         : {min(gaps):.3f} / {max(gaps):.3f}")
+    print(f"Zero-gap rate       : {zero_gap_count/compared if compared else float('nan'):.2f}")
+    print(f"Avg SSP time        : {mean(ssp_times):.4f} s")
+    print(f"Speedup (LP/SSP)    : {mean(lp_times)/mean(ssp_times):.1f} x")
+    print(f"Avg SSP flow gap    : {mean(ssp_gaps):.3f}")
+    print(f"SSP cost/unit gap   : {100 * mean(cost_gaps):.1f} %")
+    print(f"Avg trial wall time : {mean(wall_times):.4f} s")
+    print(f"Timeouts / errors   : LP {failed('lp')}, FF {failed('ff')}, SSP {failed('ssp')}")
     print("==========================================\n")
 
+    return rows
+
 if __name__ == "__main__":
     random.seed(42)
 
@@ -92,8 +240,9 @@ if __name__ == "__main__":
         (14, 10),
     ]
 
+    rows = []
     for num_nodes, num_commodities in cfg:
-        benchmark(
+        rows += benchmark(
             num_nodes=num_nodes,
             num_commodities=num_commodities,
             edge_prob=0.05,
@@ -104,6 +253,7 @@ if __name__ == "__main__":
             trials=5,
         )
 
+    import pandas as pd
 
-
-    
\ No newline at end of file
+    pd.DataFrame(rows).to_csv(RESULTS, index=False)
+    print(f"Saved to {RESULTS}")
@@ -0,0 +1,299 @@
+import argparse
+import math
+import random
+import statistics
+import sys
+import time
+import pandas as pd
+
+from generators.mcf_generators import (
+    generate_layered_graph,
+    generate_random_commodities,
+    generate_random_graph,
+)
+from generators.large_generators import (
+    generate_grid_graph,
+    generate_gravity_commodities,
+    generate_hub_spoke_graph,
+    generate_rmat_graph,
+)
+from algorithms.ff import FordFulkerson
+from algorithms.ff_scaling import FordFulkersonScaling
+from algorithms.ff_mcf import MultiCommodityFlowFF
+from algorithms.lp_mcf import MultiCommodityFlowLP
+from algorithms.lp_mcf_paths import MultiCommodityFlowPathLP
+from algorithms.residual_graph import ResidualGraph
+from algorithms.bellman_ford import bellman_ford
+from algorithms.bellman_ford_np import bellman_ford_np
+from algorithms.ssp import ssp
+from algorithms.compiled_graph import compile_graph
+
+BASELINE = "results/baseline_regress.csv"
+RESULTS = "results/results_regress.csv"
+
+# fixed instance sets: (suite, size name, sizes)
+MAXFLOW_WIDTHS = [5, 10, 20, 40]
+MINCOST_WIDTHS = [5, 10, 20, 40]
+MCF_NODES = [10, 15, 20, 30]
+# structured topologies, one generator call per size (sized by arc count)
+TOPOLOGY_RMAT_SCALES = [7, 8, 9, 10]
+TOPOLOGY_GRID_SIDES = [12, 16, 24, 32]
+TOPOLOGY_HUBS = [(4, 25), (6, 40), (8, 60), (10, 100)]
+TOPOLOGY_COMMODITIES = 20
+
+SEED = 2024
+
+
+def layered_residual_graph(G, s, t, cost_low=1, cost_high=10):
+    """
+    Map a layered nx.DiGraph onto a ResidualGraph with random integer costs
+
+    Output:
+    - ResidualGraph
+    - source index
+    - sink index
+    """
+    index = {v: i for i, v in enumerate(G.nodes())}
+    g = ResidualGraph(len(index))
+    for u, v in G.edges():
+        g.add_edge(index[u], index[v], G[u][v]["capacity"], random.randint(cost_low, cost_high))
+    return g, index[s], index[t]
+
+
+def maxflow_cases():
+    for w in MAXFLOW_WIDTHS:
+        random.seed(SEED + w)
+        G, s, t = generate_layered_graph(n_layers=4, width=w, cap_low=1, cap_high=20)
+        C = compile_graph(G)
+
+        yield "maxflow", "FF", "width", w, lambda C=C, s=s, t=t: FordFulkerson(C, s, t).run
+        yield "maxflow", "FF-scaling", "width", w, lambda C=C, s=s, t=t: FordFulkersonScaling(C, s, t).run
+
+
+def mincost_cases():
+    for w in MINCOST_WIDTHS:
+        random.seed(SEED + w)
+        G, s, t = generate_layered_graph(n_layers=4, width=w, cap_low=1, cap_high=20)
+        state = random.getstate()
+
+        def setup(sp, G=G, s=s, t=t, state=state):
+            # ssp consumes its residual graph, so rebuild it (with the same costs) every time
+            random.setstate(state)
+            g, si, ti = layered_residual_graph(G, s, t)
+            return lambda: ssp(g, si, ti, sp)
+
+        yield "mincost", "SSP-BF", "width", w, lambda setup=setup: setup(bellman_ford)
+        yield "mincost", "SSP-BF-np", "width", w, lambda setup=setup: setup(bellman_ford_np)
+
+
+def mcf_cases():
+    for n in MCF_NODES:
+        random.seed(SEED + n)
+        # guarantee one valid graph and one valid commodities
+        while True:
+            G = generate_random_graph(num_nodes=n, edge_prob=0.2, cap_min=1, cap_max=10)
+            if G is None:
+                continue
+            commodities = generate_random_commodities(
+                G, num_commodities=max(2, int(0.3 * n)), demand_min=5, demand_max=20
+            )
+            if commodities is not None:
+                break
+
+        C = compile_graph(G)
+
+        yield "mcf", "MCF-FF", "nodes", n, lambda C=C, c=commodities: MultiCommodityFlowFF(C, c).run
+        yield "mcf", "MCF-LP", "nodes", n, lambda C=C, c=commodities: MultiCommodityFlowLP(C, c).solve
+        yield "mcf", "MCF-LP-paths", "nodes", n, lambda C=C, c=commodities: MultiCommodityFlowPathLP(C, c).solve
+
+
+def topology_cases():
+    # skewed-degree, grid and backbone graphs with gravity demands (MCF-FF only)
+    families = [
+        ("rmat", [generate_rmat_graph(k, seed=SEED) for k in TOPOLOGY_RMAT_SCALES]),
+        ("grid", [generate_grid_graph(k, k, torus=True, seed=SEED) for k in TOPOLOGY_GRID_SIDES]),
+        ("hub", [generate_hub_spoke_graph(h, k, seed=SEED) for h, k in TOPOLOGY_HUBS]),
+    ]
+    for family, graphs in families:
+        for C in graphs:
+            commodities = generate_gravity_commodities(C, TOPOLOGY_COMMODITIES, seed=SEED)
+            yield "topology", f"MCF-FF-{family}", "arcs", C.m, lambda C=C, c=commodities: MultiCommodityFlowFF(C, c).run
+
+
+def time_case(setup, warmup, repeats, min_sample):
+    """
+    setup() builds a fresh engine and returns the callable to time
+
+    Sub-millisecond cases are dominated by timer and scheduler noise, so every
+    sample averages a batch of calls sized (from the warmup) to last at least
+    min_sample seconds; setup() stays outside the timed part.
+
+    Output:
+    - per-call times, one per sample
+    - calls per sample
+    """
+    elapsed = math.inf
+    for _ in range(max(1, warmup)):
+        fn = setup()
+        start = time.perf_counter()
+        fn()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    batch = max(1, math.ceil(min_sample / max(elapsed, 1e-9)))
+
+    samples = []
+    for _ in range(repeats):
+        total = 0.0
+        for _ in range(batch):
+            fn = setup()
+            start = time.perf_counter()
+            fn()
+            total += time.perf_counter() - start
+        samples.append(total / batch)
+    return samples, batch
+
+
+def median_ci(samples, level=0.95, resamples=1000):
+    """
+    Bootstrap confidence interval of the median (deterministic resampling)
+    """
+    rng = random.Random(SEED)
+    meds = sorted(
+        statistics.median(rng.choices(samples, k=len(samples)))
+        for _ in range(resamples)
+    )
+    lo = meds[int((1 - level) / 2 * resamples)]
+    hi = meds[min(resamples - 1, int((1 + level) / 2 * resamples))]
+    return statistics.median(samples), lo, hi
+
+
+def loglog_slope(sizes, runtimes):
+    # least-squares slope of log(runtime) vs log(size)
+    if len(sizes) < 2:
+        return math.nan
+    xs = [math.log(x) for x in sizes]
+    ys = [math.log(max(y, 1e-9)) for y in runtimes]
+    slope, _ = statistics.linear_regression(xs, ys)
+    return slope
+
+
+def run(suites, warmup, repeats, min_sample):
+    cases = {
+        "maxflow": maxflow_cases,
+        "mincost": mincost_cases,
+        "mcf": mcf_cases,
+        "topology": topology_cases,
+    }
+    records = []
+
+    for name in suites:
+        for suite, algo, size_key, size, setup in cases[name]():
+            samples, batch = time_case(setup, warmup, repeats, min_sample)
+            med, lo, hi = median_ci(samples)
+            records.append({
+                "suite": suite,
+                "algo": algo,
+                "size_key": size_key,
+                "size": size,
+                "median": med,
+                "ci_low": lo,
+                "ci_high": hi,
+                "repeats": repeats,
+                "batch": batch,
+            })
+            print(f"[{suite}] {algo:<10} {size_key}={size:<4} median={med:.5f}s  CI=[{lo:.5f}, {hi:.5f}]")
+
+    return pd.DataFrame(records)
+
+
+def slopes(df):
+    out = {}
+    for (suite, algo), grp in df.groupby(["suite", "algo"]):
+        grp = grp.sort_values("size")
+        out[(suite, algo)] = loglog_slope(list(grp["size"]), list(grp["median"]))
+    return out
+
+
+def compare(df, base, threshold, slope_tol, floor):
+    """
+    Compare a run against the baseline; an instance is only slower if it also
+    lost more than `floor` seconds per call
+
+    Output:
+    - list of regression messages (empty when the run passes)
+    """
+    failures = []
+    merged = df.merge(base, on=["suite", "algo", "size_key", "size"], suffixes=("", "_base"))
+
+    print("\n=== Per-instance comparison ===")
+    for _, r in merged.iterrows():
+        ratio = r["median"] / r["median_base"]
+        # slower beyond the threshold and the intervals do not overlap
+        slow = (
+            ratio > 1 + threshold
+            and r["ci_low"] > r["ci_high_base"]
+            and r["median"] - r["median_base"] > floor
+        )
+        flag = "SLOWER" if slow else "ok"
+        print(f"[{r['suite']}] {r['algo']:<10} {r['size_key']}={r['size']:<4} x{ratio:.2f}  {flag}")
+        if slow:
+            failures.append(
+                f"{r['algo']} {r['size_key']}={r['size']}: median {r['median']:.5f}s vs "
+                f"baseline {r['median_base']:.5f}s (x{ratio:.2f})"
+            )
+
+    print("\n=== Log-log scaling slopes ===")
+    cur, ref = slopes(df), slopes(base)
+    for key, slope in cur.items():
+        if key not in ref:
+            continue
+        suite, algo = key
+        worse = slope > ref[key] + slope_tol
+        print(f"[{suite}] {algo:<10} slope={slope:.2f}  baseline={ref[key]:.2f}  {'STEEPER' if worse else 'ok'}")
+        if worse:
+            failures.append(f"{algo}: scaling slope {slope:.2f} vs baseline {ref[key]:.2f}")
+
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Performance regression suite")
+    parser.add_argument("--suites", nargs="+", default=["maxflow", "mincost", "mcf", "topology"])
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed median slowdown (0.25 = 25%%)")
+    parser.add_argument("--slope-tol", type=float, default=0.3, help="allowed increase of log-log slope")
+    parser.add_argument("--min-sample-ms", type=float, default=50.0,
+                        help="batch calls so every sample lasts at least this long")
+    parser.add_argument("--floor-ms", type=float, default=0.5, help="absolute slowdown per call always allowed")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    df = run(args.suites, args.warmup, args.repeats, args.min_sample_ms / 1000)
+    df.to_csv(RESULTS, index=False)
+    print(f"\nSaved to {RESULTS}")
+
+    if args.save_baseline:
+        df.to_csv(args.baseline, index=False)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    try:
+        base = pd.read_csv(args.baseline)
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}, run with --save-baseline first")
+        return 2
+
+    failures = compare(df, base, args.threshold, args.slope_tol, args.floor_ms / 1000)
+    if failures:
+        print("\n=== REGRESSIONS ===")
+        for msg in failures:
+            print(f"  {msg}")
+        return 1
+
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import argparse
+import csv
+import statistics
+import subprocess
+import sys
+
+BASELINE = "results/baseline_startup.csv"
+RESULTS = "results/results_startup.csv"
+
+# solver core: must import without any of HEAVY
+CORE = [
+    "algorithms.compiled_graph",
+    "algorithms.residual_graph",
+    "algorithms.flow_result",
+    "algorithms.flow_decomposition",
+    "algorithms.shared_graph",
+    "algorithms.mcf_bounds",
+    "algorithms.ff",
+    "algorithms.ff_scaling",
+    "algorithms.ff_mcf",
+    "algorithms.ssp",
+    "algorithms.ssp_mcf",
+    "algorithms.bellman_ford_np",
+    "algorithms.cycle_canceling",
+    "algorithms.lagrangian_mcf",
+    # PuLP loads in solve(), not on import
+    "algorithms.lp_mcf",
+    "generators.large_generators",
+]
+HEAVY = ["networkx", "pulp", "pandas", "seaborn", "matplotlib"]
+
+
+def import_profile(module):
+    """
+    Import `module` in a fresh interpreter under -X importtime
+
+    Output:
+    - cumulative import time of `module` in microseconds
+    - set of top-level packages the import pulled in
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+
+    cumulative = None
+    loaded = set()
+    # stderr lines: "import time: <self us> | <cumulative us> | <indented name>"
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # header
+        name = parts[2].strip()
+        loaded.add(name.split(".")[0])
+        if name == module:
+            cumulative = int(parts[1])
+    return cumulative, loaded
+
+
+def run(modules, repeats):
+    """
+    Output:
+    - list of {"module", "median_us", "min_us", "heavy"} rows, one per module
+    """
+    rows = []
+    for module in modules:
+        times = []
+        heavy = set()
+        for _ in range(repeats):
+            us, loaded = import_profile(module)
+            times.append(us)
+            heavy |= loaded & set(HEAVY)
+        row = {
+            "module": module,
+            "median_us": int(statistics.median(times)),
+            "min_us": min(times),
+            "heavy": " ".join(sorted(heavy)),
+        }
+        print(f"{module:<32} {row['median_us'] / 1000:8.1f} ms  {row['heavy'] or '-'}")
+        rows.append(row)
+    return rows
+
+
+def compare(rows, base, threshold, slack_us):
+    """
+    Output:
+    - list of regression messages (empty when the run passes)
+    """
+    failures = []
+    ref = {r["module"]: int(r["median_us"]) for r in base}
+
+    print("\n=== Per-module comparison ===")
+    for r in rows:
+        if r["heavy"]:
+            failures.append(f"{r['module']}: imports {r['heavy']}")
+        if r["module"] not in ref:
+            continue
+        limit = ref[r["module"]] * (1 + threshold) + slack_us
+        slow = r["median_us"] > limit
+        print(f"{r['module']:<32} x{r['median_us'] / ref[r['module']]:.2f}  {'SLOWER' if slow else 'ok'}")
+        if slow:
+            failures.append(
+                f"{r['module']}: median {r['median_us'] / 1000:.1f} ms vs "
+                f"baseline {ref[r['module']] / 1000:.1f} ms"
+            )
+    return failures
+
+
+def write_csv(path, rows):
+    with open(path, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=["module", "median_us", "min_us", "heavy"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time (startup) regression check")
+    parser.add_argument("--modules", nargs="+", default=CORE)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.5, help="allowed median slowdown (0.5 = 50%%)")
+    parser.add_argument("--slack-ms", type=float, default=20.0, help="absolute slowdown always allowed")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    rows = run(args.modules, args.repeats)
+    write_csv(RESULTS, rows)
+    print(f"\nSaved to {RESULTS}")
+
+    if args.save_baseline:
+        write_csv(args.baseline, rows)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, newline="") as fh:
+            base = list(csv.DictReader(fh))
+    except FileNotFoundError:
+        print(f"No baseline at {args.baseline}, run with --save-baseline first")
+        return 2
+
+    failures = compare(rows, base, args.threshold, args.slack_ms * 1000)
+    if failures:
+        print("\n=== REGRESSIONS ===")
+        for msg in failures:
+            print(f"  {msg}")
+        return 1
+
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
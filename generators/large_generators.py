@@ -0,0 +1,189 @@
+"""
+Large structured instances built straight into CompiledGraph arrays (vectorized,
+seeded with numpy's default_rng); nodes are the integer ids 0..n-1. Every
+generator takes as_networkx=True to return an nx.DiGraph instead (small cases).
+"""
+import numpy as np
+from algorithms.compiled_graph import CompiledGraph
+
+def _arc_keys(n, tail, head):
+    # sorted distinct tail * n + head, self loops dropped (sort + diff beats np.unique here)
+    keep = tail != head
+    key = np.sort(tail[keep] * n + head[keep])
+    if len(key) == 0:
+        return key
+    return key[np.concatenate([[True], key[1:] != key[:-1]])]
+
+def _finish(n, tail, head, rng, cap_min, cap_max, cost_min, cost_max, as_networkx):
+    # drop self loops and parallel arcs, draw capacities (and costs), wrap
+    key = _arc_keys(n, tail, head)
+    tail, head = key // n, key % n
+
+    cap = rng.integers(cap_min, cap_max + 1, size=len(key))
+    cost = None if cost_max is None else rng.integers(cost_min, cost_max + 1, size=len(key))
+
+    C = CompiledGraph.from_arrays(n, tail, head, cap, cost)
+    return C.to_digraph() if as_networkx else C
+
+def generate_rmat_graph(scale, edge_factor=16, a=0.57, b=0.19, c=0.19,
+                        cap_min=5, cap_max=20, cost_min=None, cost_max=None,
+                        seed=None, as_networkx=False):
+    """
+    R-MAT (recursive Kronecker) power-law graph
+
+    Input:
+    - scale: 2^scale nodes
+    - edge_factor: arcs drawn per node (before dropping loops / duplicates)
+    - a, b, c: quadrant probabilities (d = 1 - a - b - c), the defaults are Graph500's
+    - capacity range, cost range (optional)
+
+    Output:
+    - CompiledGraph (or nx.DiGraph); skewed degrees, not necessarily connected
+    """
+    rng = np.random.default_rng(seed)
+    n = 1 << scale
+    m = edge_factor * n
+
+    tail = np.zeros(m, dtype=np.int64)
+    head = np.zeros(m, dtype=np.int64)
+    for bit in range(scale):
+        r = rng.random(m)
+        # quadrant a: (0, 0), b: (0, 1), c: (1, 0), d: (1, 1)
+        down = r >= a + b
+        right = ((r >= a) & ~down) | (r >= a + b + c)
+        tail |= down.astype(np.int64) << bit
+        head |= right.astype(np.int64) << bit
+
+    # shuffle ids so high-degree nodes are not the low ids
+    perm = rng.permutation(n)
+    return _finish(n, perm[tail], perm[head], rng, cap_min, cap_max, cost_min, cost_max, as_networkx)
+
+def generate_grid_graph(rows, cols, torus=False,
+                        cap_min=5, cap_max=20, cost_min=None, cost_max=None,
+                        seed=None, as_networkx=False):
+    """
+    2-D grid (or torus) with arcs both ways between 4-neighbors
+
+    Input:
+    - rows, cols: node (r, c) is id r * cols + c
+    - torus: wrap around both dimensions
+    - capacity range, cost range (optional)
+
+    Output:
+    - CompiledGraph (or nx.DiGraph); strongly connected, long shortest paths
+    """
+    rng = np.random.default_rng(seed)
+    n = rows * cols
+    r, c = np.divmod(np.arange(n, dtype=np.int64), cols)
+
+    if torus:
+        right = r * cols + (c + 1) % cols
+        down = ((r + 1) % rows) * cols + c
+        pairs = [(np.arange(n), right), (np.arange(n), down)]
+    else:
+        has_right, has_down = c < cols - 1, r < rows - 1
+        ids = np.arange(n, dtype=np.int64)
+        pairs = [(ids[has_right], ids[has_right] + 1), (ids[has_down], ids[has_down] + cols)]
+
+    u = np.concatenate([p for p, _ in pairs])
+    v = np.concatenate([q for _, q in pairs])
+    tail = np.concatenate([u, v])
+    head = np.concatenate([v, u])
+    return _finish(n, tail, head, rng, cap_min, cap_max, cost_min, cost_max, as_networkx)
+
+def generate_hub_spoke_graph(num_hubs, spokes_per_hub, dual_homing=0.2,
+                             backbone_cap=(100, 400), access_cap=(5, 20),
+                             cost_min=None, cost_max=None,
+                             seed=None, as_networkx=False):
+    """
+    Two-tier backbone: fully meshed hubs with large capacities, each spoke linked
+    (both ways) to its hub, some spokes to a second hub as well
+
+    Input:
+    - num_hubs: hubs are ids 0..num_hubs-1
+    - spokes_per_hub: spokes are the following ids, spoke i homed on hub i % num_hubs
+    - dual_homing: probability a spoke also links to a second (random) hub
+    - backbone_cap, access_cap: capacity ranges of hub-hub and hub-spoke arcs
+    - cost range (optional)
+
+    Output:
+    - CompiledGraph (or nx.DiGraph); strongly connected, hubs are the bottleneck
+    """
+    rng = np.random.default_rng(seed)
+    H = num_hubs
+    S = num_hubs * spokes_per_hub
+    n = H + S
+
+    hu, hv = np.meshgrid(np.arange(H), np.arange(H), indexing="ij")
+    mesh = hu != hv
+    bb_tail, bb_head = hu[mesh].astype(np.int64), hv[mesh].astype(np.int64)
+
+    spokes = H + np.arange(S, dtype=np.int64)
+    home = np.arange(S, dtype=np.int64) % H
+    if H > 1:
+        dual = rng.random(S) < dual_homing
+        second = (home[dual] + rng.integers(1, H, size=int(dual.sum()))) % H
+        spokes = np.concatenate([spokes, spokes[dual]])
+        home = np.concatenate([home, second])
+
+    acc_tail = np.concatenate([spokes, home])
+    acc_head = np.concatenate([home, spokes])
+
+    # duplicate cleanup, then capacities by tier (backbone arcs join two hubs)
+    key = _arc_keys(n, np.concatenate([bb_tail, acc_tail]), np.concatenate([bb_head, acc_head]))
+    backbone = (key // n < H) & (key % n < H)
+
+    cap = np.where(
+        backbone,
+        rng.integers(backbone_cap[0], backbone_cap[1] + 1, size=len(key)),
+        rng.integers(access_cap[0], access_cap[1] + 1, size=len(key)),
+    )
+    cost = None if cost_max is None else rng.integers(cost_min, cost_max + 1, size=len(key))
+
+    C = CompiledGraph.from_arrays(n, key // n, key % n, cap, cost)
+    return C.to_digraph() if as_networkx else C
+
+def generate_gravity_commodities(C, num_commodities, total_demand=None, mass=None, seed=None):
+    """
+    Gravity-model demands: pairs (s, t) drawn with probability ~ mass[s] * mass[t],
+    demand proportional to mass[s] * mass[t]
+
+    Input:
+    - C: CompiledGraph (or nx.DiGraph)
+    - num_commodities: distinct (s, t) pairs to draw (fewer if the graph is tiny)
+    - total_demand: sum of all demands (default: a tenth of the total capacity)
+    - mass: per-node-id weights (default: capacity leaving each node)
+
+    Output:
+    - commodities: Dict[str, (src, dst, demand)], integer demands >= 1; pairs are
+      not checked for reachability (too costly at this scale)
+    """
+    if not isinstance(C, CompiledGraph):
+        C = CompiledGraph.from_networkx(C)
+    rng = np.random.default_rng(seed)
+    n = C.n
+
+    if mass is None:
+        mass = np.bincount(C.tail, weights=C.cap, minlength=n)
+    mass = np.asarray(mass, dtype=float)
+    if total_demand is None:
+        total_demand = max(1, int(C.cap.sum()) // 10)
+
+    # oversample, drop s == t and repeated pairs (keeping draw order)
+    draws = 2 * num_commodities + 16
+    prob = mass / mass.sum()
+    s = rng.choice(n, size=draws, p=prob)
+    t = rng.choice(n, size=draws, p=prob)
+    ok = s != t
+    s, t = s[ok], t[ok]
+    _, first = np.unique(s * n + t, return_index=True)
+    first = np.sort(first)[:num_commodities]
+    s, t = s[first], t[first]
+
+    weight = mass[s] * mass[t]
+    demand = np.maximum(1, np.rint(total_demand * weight / weight.sum())).astype(np.int64)
+
+    return {
+        f"K{i + 1}": (C.node_label(int(u)), C.node_label(int(v)), int(d))
+        for i, (u, v, d) in enumerate(zip(s, t, demand))
+    }
@@ -32,12 +32,13 @@ def generate_random_commodities(G, num_commodities=3, demand_min=5, demand_max=2
 
     return commodities
 
-def generate_random_graph(num_nodes=10, edge_prob=0.3, cap_min=5, cap_max=20):
+def generate_random_graph(num_nodes=10, edge_prob=0.3, cap_min=5, cap_max=20, cost_min=None, cost_max=None):
     """
     Input: 
     - number of nodes
     - edge probability
     - capacity range
+    - cost range (optional, stored as edge "weight")
 
     Output:
     - NetworkX.DiGraph()
@@ -51,7 +52,10 @@ def generate_random_graph(num_nodes=10, edge_prob=0.3, cap_min=5, cap_max=20):
                 continue
             if random.random() < edge_prob:
                 cap = random.randint(cap_min, cap_max)
-                G.add_edge(u, v, capacity=cap)
+                if cost_max is None:
+                    G.add_edge(u, v, capacity=cap)
+                else:
+                    G.add_edge(u, v, capacity=cap, weight=random.randint(cost_min, cost_max))
 
     # happens when edge_prob is too low
     if G.number_of_edges() == 0:
@@ -1,7 +1,34 @@
 from algorithms.ssp import ssp
 from algorithms.bellman_ford import bellman_ford
+from algorithms.bellman_ford_np import SMALL_ARCS, bellman_ford_np, has_negative_cycle
+from algorithms.cycle_canceling import cycle_canceling
 from algorithms.residual_graph import ResidualGraph
+from algorithms.compiled_graph import compile_graph
+from algorithms.ff import FordFulkerson
+from algorithms.ff_scaling import FordFulkersonScaling
+from algorithms.ff_mcf import MultiCommodityFlowFF
+from algorithms.lp_mcf import MultiCommodityFlowLP
+from algorithms.lp_mcf_highs import PersistentMultiCommodityFlowLP
+from algorithms.mcf_bounds import throughput_upper_bound
+from algorithms.ssp_mcf import MultiCommodityFlowSSP
+from algorithms.dijkstra import dijkstra
+from algorithms.lp_mcf_paths import MultiCommodityFlowPathLP
+from algorithms.lagrangian_mcf import MultiCommodityFlowLagrangian
+from algorithms.path_search import EPS, BidirectionalSearch
+from algorithms.flow_decomposition import decompose_flow, engine_paths
+from algorithms.shared_graph import SharedGraph
+from generators.large_generators import (
+    generate_gravity_commodities,
+    generate_grid_graph,
+    generate_hub_spoke_graph,
+    generate_rmat_graph,
+)
+from generators.mcf_generators import generate_layered_graph, generate_random_commodities, generate_random_graph
 import networkx as nx
+import pulp
+import random
+import time
+import warnings
 
 print("Running SSP Bellman Ford...")
 
@@ -32,4 +59,589 @@ print(f"[NetworkX] flow = {flow_nx}, cost = {cost_nx}")
 
 assert flow == flow_nx
 assert cost == cost_nx
-print("Pass!")
\ No newline at end of file
+
+print("Running SSP vectorized Bellman Ford...")
+
+g = ResidualGraph(n)
+for u, v, c, w in [(0, 1, 3, 1), (1, 3, 3, 1), (0, 2, 2, 2), (2, 3, 2, 2)]:
+    g.add_edge(u, v, c, w)
+
+flow_np, cost_np = ssp(g, s, t, bellman_ford_np)
+print(f"[SSP-BF-np] flow = {flow_np}, cost = {cost_np}")
+
+assert flow_np == flow_nx
+assert cost_np == cost_nx
+
+# large enough for the vectorized passes (not the small-graph fallback)
+random.seed(7)
+G, s_big, t_big = generate_layered_graph(n_layers=4, width=10, cap_low=1, cap_high=20)
+for u, v in G.edges():
+    G[u][v]["weight"] = random.randint(1, 10)
+
+C = compile_graph(G)
+assert 2 * C.m >= SMALL_ARCS
+results = [
+    ssp(C.residual_graph(), C.node_id(s_big), C.node_id(t_big), sp)
+    for sp in (bellman_ford, bellman_ford_np)
+]
+flow_dict = nx.max_flow_min_cost(G, s_big, t_big)
+big_nx = (sum(flow_dict[s_big].values()), nx.cost_of_flow(G, flow_dict))
+print(f"[SSP-BF / SSP-BF-np, width 10] {results}, nx = {big_nx}")
+
+assert results[0] == results[1] == big_nx
+
+print("Running cycle canceling from a non-optimal flow...")
+
+# flow 3 split 1 / 2 over the cheap (cost 2) and expensive (cost 4) path
+g = ResidualGraph(5)
+for u, v, c, w in [(0, 1, 3, 1), (1, 3, 3, 1), (0, 2, 3, 2), (2, 3, 3, 2), (3, 4, 3, 0)]:
+    g.add_edge(u, v, c, w)
+for (u, i), x in zip(g.edges, [1, 1, 2, 2, 3]):
+    e = g.g[u][i]
+    e.cap -= x
+    g.g[e.to][e.rev].cap += x
+
+cost_cc, cancels = cycle_canceling(g)
+print(f"[Cycle canceling] cost = {cost_cc}, cancels = {cancels}")
+
+G = nx.DiGraph()
+for u, v, c, w in [(0, 1, 3, 1), (1, 3, 3, 1), (0, 2, 3, 2), (2, 3, 3, 2), (3, 4, 3, 0)]:
+    G.add_edge(u, v, capacity=c, weight=w)
+cost_nx = nx.cost_of_flow(G, nx.max_flow_min_cost(G, 0, 4))
+
+assert cost_cc == cost_nx
+assert sum(g.edge_flows()[i] for i in (0, 2)) == 3
+assert not has_negative_cycle(g)
+
+print("Running engines on fractional capacities...")
+
+G = nx.DiGraph()
+G.add_edge("a", "b", capacity=2.5, weight=1.5)
+G.add_edge("b", "c", capacity=3.75, weight=1)
+G.add_edge("a", "c", capacity=0.25, weight=4)
+
+C = compile_graph(G)
+# edges in networkx order: a -> b, a -> c, b -> c
+assert C.cap.tolist() == [2.5, 0.25, 3.75]
+assert C.cost.tolist() == [1.5, 4, 1]
+
+flow_nx = nx.maximum_flow_value(G, "a", "c")
+_, flow_ff, _ = FordFulkerson(C, "a", "c").run()
+_, flow_sc, _ = FordFulkersonScaling(C, "a", "c").run()
+_, tp_mcf = MultiCommodityFlowFF(C, {"K1": ("a", "c", 10)}).run()
+_, tp_lp = MultiCommodityFlowLP(C, {"K1": ("a", "c", 10)}).solve()
+print(f"[Fractional] nx = {flow_nx}, FF = {flow_ff}, FF-scaling = {flow_sc}, MCF-FF = {tp_mcf['K1']}, MCF-LP = {tp_lp['K1']}")
+
+assert flow_nx == 2.75
+assert flow_ff == flow_sc == tp_mcf["K1"] == flow_nx
+assert abs(tp_lp["K1"] - flow_nx) < 1e-6
+
+print("Closing a shared graph while its compiled views are alive (deferred unmap)...")
+
+sg = SharedGraph.create(G)
+worker = SharedGraph.attach(sg.handle())
+Cw = worker.compiled()
+
+with warnings.catch_warnings(record=True) as caught:
+    warnings.simplefilter("always")
+    worker.close()
+    sg.close()
+print(f"[SharedGraph] deferred: {caught[0].message}")
+
+# the mapping stays until the view is gone (owner's name already unlinked)
+assert [w.category for w in caught] == [ResourceWarning]
+assert Cw.cap.tolist() == [2.5, 0.25, 3.75]
+del Cw
+
+print("Solving on a shared graph (attach / compile / solve / close)...")
+
+# nodes added in id order, so labels double as the residual graph's node ids
+G = nx.DiGraph()
+G.add_nodes_from(range(4))
+for u, v, c, w in [(0, 1, 3, 1), (1, 3, 3, 1), (0, 2, 2, 2), (2, 3, 2, 2), (1, 2, 1, 1)]:
+    G.add_edge(u, v, capacity=c, weight=w)
+
+with SharedGraph.create(G) as sg:
+    worker = SharedGraph.attach(sg.handle())
+    _, flow_sh, _ = FordFulkerson(worker.compiled(), 0, 3).run()
+    _, tp_sh = MultiCommodityFlowFF(worker.compiled(), {"K1": (0, 3, 4), "K2": (1, 3, 2)}).run()
+    flow_res, cost_res = ssp(worker.residual_graph(), 0, 3, bellman_ford)
+    assert nx.is_isomorphic(worker.to_digraph(), G)
+    worker.close()
+print(f"[SharedGraph] FF = {flow_sh}, MCF-FF = {sum(tp_sh.values())}, SSP = ({flow_res}, {cost_res})")
+
+assert flow_sh == nx.maximum_flow_value(G, 0, 3) == 5
+assert sum(tp_sh.values()) == 5
+assert (flow_res, cost_res) == (5, nx.cost_of_flow(G, nx.max_flow_min_cost(G, 0, 3)))
+
+print("Solving both MCF classes on an attached graph inside a with block...")
+
+commodities = {"K1": (0, 3, 4), "K2": (1, 3, 2)}
+with SharedGraph.create(G) as sg:
+    with SharedGraph.attach(sg.handle()) as worker:
+        _, tp_ff = MultiCommodityFlowFF(worker.compiled(), commodities).run()
+    with SharedGraph.attach(sg.handle()) as worker:
+        _, tp_lp = MultiCommodityFlowLP(worker.compiled(), commodities).solve()
+print(f"[SharedGraph] MCF-FF = {tp_ff}, MCF-LP = {tp_lp}")
+
+assert sum(tp_ff.values()) == 5
+assert abs(sum(tp_lp.values()) - 5) < 1e-6
+
+print("Running batched MCF-FF rounds on threads and on processes...")
+
+commodities = {"K1": (0, 3, 4), "K2": (1, 3, 2), "K3": (0, 2, 2)}
+_, tp_thread = MultiCommodityFlowFF(G, commodities).run(batched=True, executor="thread")
+_, tp_process = MultiCommodityFlowFF(G, commodities).run(batched=True, executor="process", max_workers=2)
+print(f"[Batched] thread = {tp_thread}, process = {tp_process}")
+
+assert tp_thread == tp_process
+
+print("Running MCF-FF with shared source trees against the default scheduler...")
+
+C = generate_rmat_graph(7, seed=3)
+commodities = generate_gravity_commodities(C, 30, seed=3)
+sources = [s for s, _, _ in commodities.values()]
+_, tp_default = MultiCommodityFlowFF(C, commodities).run()
+_, tp_trees = MultiCommodityFlowFF(C, commodities).run(share_trees=True)
+print(f"[Shared trees] default = {sum(tp_default.values())}, shared trees = {sum(tp_trees.values())}")
+
+# some source serves several commodities, so a tree is actually shared
+assert len(set(sources)) < len(sources)
+assert sum(tp_trees.values()) == sum(tp_default.values())
+
+print("Running bidirectional path search against a plain BFS...")
+
+random.seed(11)
+G = nx.gnp_random_graph(30, 0.12, seed=11, directed=True)
+nx.set_edge_attributes(G, 1, "capacity")
+C = compile_graph(G)
+search = BidirectionalSearch(C)
+found = blocked = 0
+
+for _ in range(200):
+    # random residual state: about half the arcs usable in each direction
+    fwd = [random.choice([0, 0, 1, 2]) for _ in range(C.m)]
+    bwd = [random.choice([0, 0, 0, 1]) for _ in range(C.m)]
+    s_id, t_id = random.sample(range(C.n), 2)
+
+    R = nx.DiGraph()
+    R.add_nodes_from(range(C.n))
+    for e in range(C.m):
+        if fwd[e] >= EPS:
+            R.add_edge(C.tails[e], C.heads[e])
+        if bwd[e] >= EPS:
+            R.add_edge(C.heads[e], C.tails[e])
+
+    cut = []
+    path = search.path(s_id, t_id, fwd, bwd, cut=cut)
+    if path is None:
+        assert not nx.has_path(R, s_id, t_id)
+        # the closed side's border: every cut edge is saturated
+        assert all(fwd[e] < EPS for e in cut)
+        blocked += len(cut) > 0
+    else:
+        assert len(path) == nx.shortest_path_length(R, s_id, t_id)
+        v = s_id
+        for e, forward in path:
+            assert (fwd[e] if forward else bwd[e]) >= EPS
+            assert (C.tails[e] if forward else C.heads[e]) == v
+            v = C.heads[e] if forward else C.tails[e]
+        assert v == t_id
+        found += 1
+print(f"[BidirectionalSearch] {found} paths match BFS lengths, {blocked} cuts saturated")
+
+assert found and blocked
+
+print("Running Lagrangian MCF with the topped-up lower bound...")
+
+random.seed(5)
+G, _, _ = generate_layered_graph(n_layers=3, width=4, cap_low=1, cap_high=10)
+commodities = generate_random_commodities(G, 4)
+_, tp_lp = MultiCommodityFlowLP(G, commodities).solve()
+
+# top-up only at the end: the gap left by the loop is closed by the final top-up
+log = []
+lr = MultiCommodityFlowLagrangian(G, commodities)
+lr.run(max_iterations=19, tol=0.05, executor=None, top_up_every=None, callback=lambda *a: log.append(a))
+_, dual, lower = log[-1]
+print(f"[Lagrangian] loop gap = {dual - lower:.3f}, after top-up = {lr.gap():.3f}, status = {lr.status}")
+
+assert dual - lower > 0.05 * dual
+assert lr.status == "complete"
+
+# periodic top-ups converge in fewer iterations
+runs = []
+for every in (None, 5):
+    lr = MultiCommodityFlowLagrangian(G, commodities)
+    _, tp_lr = lr.run(executor=None, top_up_every=every)
+    runs.append(lr.iterations)
+    assert lr.status == "complete"
+    assert abs(sum(tp_lr.values()) - sum(tp_lp.values())) < 1e-6
+print(f"[Lagrangian] iterations: top-up at the end = {runs[0]}, every 5 = {runs[1]}")
+
+assert runs[1] < runs[0]
+
+# no iteration at all: the flow is the FF top-up from zero, no dual bound yet
+_, tp_ff = MultiCommodityFlowFF(G, commodities).run()
+for budget in ({"max_iterations": 0}, {"time_limit": 0}):
+    lr = MultiCommodityFlowLagrangian(G, commodities)
+    _, tp_lr = lr.run(executor=None, **budget)
+    assert lr.iterations == 0 and lr.dual_bound == float("inf")
+    assert lr.status == ("iteration_limit" if "max_iterations" in budget else "time_limit")
+    assert sum(tp_lr.values()) == sum(tp_ff.values())
+print(f"[Lagrangian] no iterations: FF top-up only = {sum(tp_ff.values())}")
+
+print("Running the MCF-FF scheduler: cut off, reopened by a backward augmentation...")
+
+# B's first (shortest) path takes the shared edge x -> y; its second one undoes it
+# (bs, p1, p2, y, x, q1, q2, bt), which is the only way A ever gets x -> y
+G = nx.DiGraph()
+for u, v in [("bs", "x"), ("x", "y"), ("y", "bt"), ("bs", "p1"), ("p1", "p2"), ("p2", "y"),
+             ("x", "q1"), ("q1", "q2"), ("q2", "bt"), ("as", "x"), ("y", "at")]:
+    G.add_edge(u, v, capacity=1)
+commodities = {"A": ("as", "at", 1), "B": ("bs", "bt", 2)}
+
+def logged_run(policy):
+    ff = MultiCommodityFlowFF(G, commodities, record_paths=True)
+    searches = []
+    find_path = ff.find_path
+    def find_path_logged(p, **kw):
+        path = find_path(p, **kw)
+        searches.append((p, bool(path)))
+        return path
+    ff.find_path = find_path_logged
+    _, tp = ff.run(policy=policy)
+    return ff, searches, tp
+
+_, tp_rr = MultiCommodityFlowFF(G, commodities).run(batched=True)
+_, searches_fifo, tp_fifo = logged_run("fifo")
+ff_rem, searches_rem, tp_rem = logged_run("remaining")
+print(f"[Scheduler] round-robin = {tp_rr}, fifo = {searches_fifo}, remaining = {searches_rem}")
+
+# fifo serves A first and nobody is cut off
+assert searches_fifo[0] == ("A", True)
+assert all(ok for _, ok in searches_fifo)
+# remaining serves B (2 left) first: A is cut off at x -> y, then reopened by B's
+# backward augmentation over it (which drops B's recorded paths)
+assert searches_rem[0] == ("B", True)
+assert [ok for p, ok in searches_rem if p == "A"] == [False, True]
+assert ff_rem.paths["B"] is None
+assert tp_rr == tp_fifo == tp_rem == {"A": 1, "B": 2}
+
+print("Running flow decomposition: paths and cycles re-sum to the flow...")
+
+def resum(walks):
+    # edge flows of weighted node walks
+    total = {}
+    for walk, amount in walks:
+        for u, v in zip(walk, walk[1:]):
+            total[(u, v)] = total.get((u, v), 0) + amount
+    return total
+
+def same_flow(a, b):
+    keys = {e for e, f in a.items() if f > 1e-9} | {e for e, f in b.items() if f > 1e-9}
+    return all(abs(a.get(e, 0) - b.get(e, 0)) < 1e-9 for e in keys)
+
+# an s-t flow of 2 plus a circulation a -> b -> c -> a of 1
+flow = {("s", "a"): 2, ("a", "t"): 2, ("a", "b"): 1, ("b", "c"): 1, ("c", "a"): 1, ("s", "t"): 0}
+paths, cycles = decompose_flow(flow, "s", "t")
+print(f"[Decomposition] paths = {paths}, cycles = {cycles}")
+
+assert same_flow(resum(paths + cycles), flow)
+assert sum(amount for _, amount in paths) == 2
+assert [amount for _, amount in cycles] == [1]
+
+random.seed(13)
+G, s_big, t_big = generate_layered_graph(n_layers=4, width=6, cap_low=1, cap_high=20)
+for record in (True, False):
+    ff = FordFulkerson(G, s_big, t_big, record_paths=record)
+    flow_ff, value_ff, _ = ff.run()
+    paths = engine_paths(ff)
+    assert same_flow(resum(paths), flow_ff)
+    assert sum(amount for _, amount in paths) == value_ff
+
+commodities = generate_random_commodities(G, 4)
+mcf = MultiCommodityFlowFF(G, commodities, record_paths=True)
+flow_mcf, tp_mcf = mcf.run()
+for p, paths in engine_paths(mcf).items():
+    assert same_flow(resum(paths), dict(flow_mcf[p].nonzero()))
+    assert abs(sum(amount for _, amount in paths) - tp_mcf[p]) < 1e-9
+
+print("Running min cuts: cut capacity equals the max flow...")
+
+value_nx = nx.maximum_flow_value(G, s_big, t_big)
+for engine in (FordFulkerson(G, s_big, t_big), FordFulkersonScaling(G, s_big, t_big)):
+    _, value, _ = engine.run()
+    side, cut = engine.min_cut()
+    assert s_big in side and t_big not in side
+    assert all(u in side and v not in side for u, v in cut)
+    assert sum(G[u][v]["capacity"] for u, v in cut) == value == value_nx
+print(f"[Min cut] max flow = {value_nx}, cut edges = {len(cut)}")
+
+# one commodity asking for more than the max flow: the edges blocking it form a min cut
+mcf = MultiCommodityFlowFF(G, {"K1": (s_big, t_big, 10 * value_nx)})
+_, tp_mcf = mcf.run()
+report = mcf.saturated_report()
+cut = [e for e, ps in report.items() if "K1" in ps]
+assert all(abs(mcf.flow_result()["K1"][e] - G.edges[e]["capacity"]) < 1e-9 for e in report)
+assert sum(G.edges[e]["capacity"] for e in cut) == tp_mcf["K1"] == value_nx
+
+print("Running the path LP against the arc LP...")
+
+for seed in range(3):
+    random.seed(seed)
+    G = generate_random_graph(num_nodes=15, edge_prob=0.2, cap_min=2, cap_max=10)
+    commodities = generate_random_commodities(G, 10)
+
+    _, tp_arc = MultiCommodityFlowLP(G, commodities).solve()
+    path_lp = MultiCommodityFlowPathLP(G, commodities)
+    flow_path, tp_path = path_lp.solve()
+    print(f"[Path LP, seed {seed}] arc = {sum(tp_arc.values()):.4f}, path = {sum(tp_path.values()):.4f}, "
+          f"rounds = {path_lp.rounds}")
+
+    assert path_lp.status == "optimal"
+    assert abs(sum(tp_path.values()) - sum(tp_arc.values())) < 1e-6
+    assert abs(path_lp.upper_bound - sum(tp_path.values())) < 1e-6
+    for p, paths in path_lp.paths.items():
+        assert same_flow(resum(paths), dict(flow_path[p].nonzero()))
+
+print("Running min-cost MCF (SSP heuristic, Dijkstra, LP cost modes) against the LP cost...")
+
+random.seed(21)
+G = generate_random_graph(num_nodes=12, edge_prob=0.3, cost_min=1, cost_max=5)
+s_id, t_id = "v0", "v11"
+assert nx.has_path(G, s_id, t_id)
+
+# Dijkstra on reduced costs vs Bellman-Ford and networkx, one commodity
+C = compile_graph(G)
+flow_dict = nx.max_flow_min_cost(G, s_id, t_id)
+single_nx = (sum(flow_dict[s_id].values()), nx.cost_of_flow(G, flow_dict))
+single = [ssp(C.residual_graph(), C.node_id(s_id), C.node_id(t_id), sp) for sp in (dijkstra, bellman_ford)]
+print(f"[Dijkstra / BF] {single}, nx = {single_nx}")
+
+assert single[0] == single[1] == single_nx
+
+# one commodity: the SSP heuristic is exact; lexicographic LP and weighted LP agree
+commodities = {"K1": (s_id, t_id, 10 ** 6)}
+heuristic = MultiCommodityFlowSSP(G, commodities)
+_, tp_h = heuristic.run()
+lex = MultiCommodityFlowLP(G, commodities, cost_mode="lexicographic")
+_, tp_lex = lex.solve()
+weighted = MultiCommodityFlowLP(G, commodities, cost_mode="weighted", cost_weight=1e-4)
+_, tp_w = weighted.solve()
+print(f"[Min-cost] SSP = ({tp_h['K1']}, {heuristic.cost}), lexicographic = ({tp_lex['K1']:.4f}, "
+      f"{lex.routing_cost:.4f}), weighted = ({tp_w['K1']:.4f}, {weighted.routing_cost:.4f})")
+
+assert (tp_h["K1"], heuristic.cost) == single_nx
+assert abs(tp_lex["K1"] - single_nx[0]) < 1e-5 and abs(lex.routing_cost - single_nx[1]) < 1e-4
+assert abs(tp_w["K1"] - single_nx[0]) < 1e-5 and abs(weighted.routing_cost - single_nx[1]) < 1e-4
+assert lex.status == lex.cost_status == "optimal"
+
+# several commodities: the heuristic is feasible, routes at most the LP's flow, and
+# never beats the LP's min cost at equal throughput
+commodities = generate_random_commodities(G, 5)
+heuristic = MultiCommodityFlowSSP(G, commodities)
+flow_h, tp_h = heuristic.run()
+lex = MultiCommodityFlowLP(G, commodities, cost_mode="lexicographic")
+_, tp_lex = lex.solve()
+_, tp_max = MultiCommodityFlowLP(G, commodities).solve()
+load = flow_h.to_numpy().sum(axis=0)
+print(f"[Min-cost, 5 commodities] SSP = ({sum(tp_h.values())}, {heuristic.cost}), "
+      f"LP = ({sum(tp_lex.values()):.4f}, {lex.routing_cost:.4f})")
+
+assert all(load <= compile_graph(G).cap + 1e-9)
+assert sum(tp_h.values()) <= sum(tp_lex.values()) + 1e-6
+assert abs(sum(tp_lex.values()) - sum(tp_max.values())) < 1e-6
+if abs(sum(tp_h.values()) - sum(tp_lex.values())) < 1e-6:
+    assert heuristic.cost >= lex.routing_cost - 1e-4
+
+# a lexicographic stage 2 that stops without a usable point keeps stage 1's flow
+class StoppedCostStage(MultiCommodityFlowLP):
+    def run_cbc(self, prob, time_limit, max_iterations):
+        status = super().run_cbc(prob, time_limit, max_iterations)
+        if prob.sense == pulp.LpMinimize:
+            for var in prob.variables():
+                var.varValue = -1.0
+            return "iteration_limit"
+        return status
+
+stopped = StoppedCostStage(G, commodities, cost_mode="lexicographic")
+_, tp_stopped = stopped.solve()
+print(f"[Min-cost] stage 2 stopped: status = {stopped.status}, cost status = {stopped.cost_status}, "
+      f"throughput = {sum(tp_stopped.values()):.4f}")
+
+assert (stopped.status, stopped.cost_status) == ("optimal", "iteration_limit")
+assert abs(sum(tp_stopped.values()) - sum(tp_max.values())) < 1e-6
+
+print("Running MCF-FF and MCF-LP under time / iteration budgets...")
+
+optimum = sum(tp_max.values())
+bound = throughput_upper_bound(G, commodities)
+assert bound >= optimum - 1e-6
+
+# MCF-FF: stops after max_iterations augmentations, callback after each one
+calls = []
+mcf = MultiCommodityFlowFF(G, commodities)
+_, tp_budget = mcf.run(max_iterations=3, callback=lambda it, total: calls.append((it, total)))
+assert mcf.status == "iteration_limit" and mcf.iterations == 3
+assert [it for it, _ in calls] == [1, 2, 3]
+assert [total for _, total in calls] == sorted(total for _, total in calls)
+assert calls[-1][1] == sum(tp_budget.values())
+assert mcf.upper_bound() == bound and mcf.gap() == bound - sum(tp_budget.values()) > 0
+
+mcf = MultiCommodityFlowFF(G, commodities)
+_, tp_budget = mcf.run(time_limit=0)
+assert mcf.status == "time_limit" and sum(tp_budget.values()) == 0
+
+mcf = MultiCommodityFlowFF(G, commodities)
+_, tp_budget = mcf.run()
+assert mcf.status == "complete" and mcf.gap() >= 0
+
+# MCF-LP: no time left after the model build -> no CBC run, zero flow, cut bound
+calls = []
+lp = MultiCommodityFlowLP(G, commodities)
+_, tp_budget = lp.solve(time_limit=0, callback=lambda it, total: calls.append((it, total)))
+assert lp.status == "time_limit" and sum(tp_budget.values()) == 0
+assert lp.upper_bound == bound and calls == [(1, 0)]
+
+lp = MultiCommodityFlowLP(G, commodities)
+_, tp_budget = lp.solve(max_iterations=1)
+assert lp.status == "iteration_limit"
+assert sum(tp_budget.values()) <= optimum + 1e-6 and lp.upper_bound == bound
+
+lp = MultiCommodityFlowLP(G, commodities)
+_, tp_budget = lp.solve(time_limit=60, callback=lambda it, total: calls.append((it, total)))
+assert lp.status == "optimal" and abs(lp.upper_bound - optimum) < 1e-6
+assert calls[-1] == (1, sum(tp_budget.values()))
+
+# the deadline covers both lexicographic stages: stage 1 uses it up, stage 2 is skipped
+class SlowFirstStage(MultiCommodityFlowLP):
+    def run_cbc(self, prob, time_limit, max_iterations):
+        status = super().run_cbc(prob, time_limit, max_iterations)
+        time.sleep(max(0.0, time_limit))
+        return status
+
+slow = SlowFirstStage(G, commodities, cost_mode="lexicographic")
+_, tp_budget = slow.solve(time_limit=1)
+print(f"[Budgets] LP optimum = {optimum:.4f}, cut bound = {bound}, lexicographic under a deadline: "
+      f"{slow.status} / {slow.cost_status}")
+
+assert (slow.status, slow.cost_status) == ("optimal", "time_limit")
+assert abs(sum(tp_budget.values()) - optimum) < 1e-6
+
+print("Running the persistent HiGHS LP warm re-solves against a fresh LP...")
+
+random.seed(23)
+H = G.copy()
+demands = dict(commodities)
+warm = PersistentMultiCommodityFlowLP(H, commodities)
+warm.solve()
+for rnd in range(4):
+    # a few capacities (one closed entirely) and one demand change per round
+    changed = {e: random.choice([0, random.randint(1, 20)]) for e in random.sample(list(H.edges()), 4)}
+    nx.set_edge_attributes(H, changed, "capacity")
+    p = random.choice(list(demands))
+    s_lab, t_lab, _ = demands[p]
+    demands[p] = (s_lab, t_lab, random.randint(1, 30))
+
+    warm.set_capacities(changed)
+    warm.set_demands({p: demands[p][2]})
+    flow_warm, tp_warm = warm.solve()
+    _, tp_fresh = MultiCommodityFlowLP(H, demands).solve()
+    print(f"[Persistent LP, round {rnd + 1}] warm = {sum(tp_warm.values()):.4f} "
+          f"({warm.iterations} iterations), fresh = {sum(tp_fresh.values()):.4f}")
+
+    assert warm.status == "optimal"
+    assert abs(sum(tp_warm.values()) - sum(tp_fresh.values())) < 1e-6
+    assert all(tp_warm[q] <= demands[q][2] + 1e-9 for q in demands)
+    load = flow_warm.to_numpy().sum(axis=0)
+    assert all(load[i] <= H.edges[e]["capacity"] + 1e-9 for i, e in enumerate(flow_warm.edges))
+
+print("Running FlowResult as the old nested dict...")
+
+G = nx.DiGraph()
+for u, v in [("a", "b"), ("b", "c"), ("a", "c")]:
+    G.add_edge(u, v, capacity=2)
+commodities = {"K1": ("a", "c", 3), "K2": ("b", "c", 1)}
+flow_mcf, tp_mcf = MultiCommodityFlowFF(G, commodities).run()
+expected = {
+    "K1": {("a", "b"): 1.0, ("b", "c"): 1.0, ("a", "c"): 2.0},
+    "K2": {("a", "b"): 0.0, ("b", "c"): 1.0, ("a", "c"): 0.0},
+}
+print(f"[FlowResult] {dict((p, dict(flow_mcf[p])) for p in flow_mcf)}")
+
+assert tp_mcf == {"K1": 3, "K2": 1}
+
+# Mapping protocol: same keys, order, values and lookups as the nested dict
+assert {p: dict(row) for p, row in flow_mcf.items()} == expected
+assert list(flow_mcf) == ["K1", "K2"] and len(flow_mcf) == 2 and "K1" in flow_mcf
+assert list(flow_mcf["K1"]) == list(G.edges()) and len(flow_mcf["K2"]) == 3
+assert flow_mcf["K2"][("b", "c")] == 1.0 and flow_mcf["K2"].get(("x", "y"), -1) == -1
+assert dict(flow_mcf["K1"].nonzero()) == expected["K1"]
+assert sorted(flow_mcf.nonzero()) == sorted(
+    (p, e, f) for p, row in expected.items() for e, f in row.items() if f
+)
+
+# to_numpy is the backing K x E array itself; to_pandas views it, dense or long-form
+arr = flow_mcf.to_numpy()
+assert arr.shape == (2, 3) and arr is flow_mcf.data
+df = flow_mcf.to_pandas()
+assert df.loc["K1", ("a", "c")] == 2.0 and df.shape == (2, 3)
+long = flow_mcf.to_pandas(sparse=True)
+assert len(long) == 4
+assert set(long.itertuples(index=False, name=None)) == {
+    (p, u, v, f) for p, row in expected.items() for (u, v), f in row.items() if f
+}
+
+print("Running the large structured generators at small scale...")
+
+def arc_set(C):
+    arcs = list(zip(C.tail.tolist(), C.head.tolist()))
+    assert all(u != v for u, v in arcs)
+    assert len(set(arcs)) == len(arcs)
+    return set(arcs)
+
+def same_graph(C, D):
+    return (C.n == D.n and C.tail.tolist() == D.tail.tolist() and C.head.tolist() == D.head.tolist()
+            and C.cap.tolist() == D.cap.tolist() and C.cost.tolist() == D.cost.tolist())
+
+# R-MAT: at most edge_factor * n arcs after dropping loops / duplicates
+R = generate_rmat_graph(6, edge_factor=8, cost_min=1, cost_max=4, seed=1)
+arcs = arc_set(R)
+assert R.n == 64 and 0 < R.m <= 8 * 64
+assert R.cap.min() >= 5 and R.cap.max() <= 20 and R.cost.min() >= 1 and R.cost.max() <= 4
+assert same_graph(R, generate_rmat_graph(6, edge_factor=8, cost_min=1, cost_max=4, seed=1))
+assert not same_graph(R, generate_rmat_graph(6, edge_factor=8, cost_min=1, cost_max=4, seed=2))
+
+# grid: 2 arcs per neighbor pair; torus: 4 per node
+Gr = generate_grid_graph(4, 5, cap_min=1, cap_max=3, seed=1)
+arc_set(Gr)
+assert Gr.m == 2 * (4 * 4 + 3 * 5) and Gr.cap.min() >= 1 and Gr.cap.max() <= 3
+assert (0, 1) in arc_set(Gr) and (1, 0) in arc_set(Gr) and (0, 5) in arc_set(Gr)
+T = generate_grid_graph(5, 5, torus=True, seed=1)
+assert T.m == 4 * 25 and (4, 0) in arc_set(T) and (20, 0) in arc_set(T)
+
+# hub and spoke: full hub mesh + both-way access links (+ second homes)
+for dual, per_spoke in [(0.0, 2), (1.0, 4)]:
+    Hs = generate_hub_spoke_graph(3, 4, dual_homing=dual, backbone_cap=(100, 200), access_cap=(5, 9), seed=1)
+    arc_set(Hs)
+    assert Hs.n == 3 + 12 and Hs.m == 3 * 2 + per_spoke * 12
+    backbone = (Hs.tail < 3) & (Hs.head < 3)
+    assert backbone.sum() == 6
+    assert Hs.cap[backbone].min() >= 100 and Hs.cap[~backbone].max() <= 9
+
+# as_networkx wraps the same arcs (and isolated nodes) in an nx.DiGraph
+D = generate_rmat_graph(6, edge_factor=8, cost_min=1, cost_max=4, seed=1, as_networkx=True)
+assert isinstance(D, nx.DiGraph) and sorted(D.nodes()) == list(range(64))
+assert set(D.edges()) == arcs
+assert all(D[u][v]["capacity"] == R.cap[R.edge_id(u, v)] for u, v in arcs)
+
+# gravity demands: distinct pairs, s != t, integer demands >= 1
+demands = generate_gravity_commodities(R, 20, total_demand=1000, seed=1)
+pairs = [(s, t) for s, t, _ in demands.values()]
+assert len(demands) == 20 and len(set(pairs)) == 20 and all(s != t for s, t in pairs)
+assert all(isinstance(d, int) and d >= 1 for _, _, d in demands.values())
+assert demands == generate_gravity_commodities(R, 20, total_demand=1000, seed=1)
+print(f"[Generators] R-MAT m = {R.m}, grid m = {Gr.m}, torus m = {T.m}, demand = "
+      f"{sum(d for _, _, d in demands.values())}")
+print("Pass!")